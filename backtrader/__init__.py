@@ -39,8 +39,10 @@ from .resampler import *
 from .utils import num2date, date2num
 
 from . import feeds
+from . import fillers
 from . import indicators
 from . import strategies
 from . import observers
+from . import analyzers
 
 __version__ = '1.0.7.86'
@@ -23,6 +23,7 @@ from __future__ import (absolute_import, division, print_function,
 
 import six
 
+from .metabase import MetaParams
 from .observer import LineObserver
 from .observers import BuySellObserver
 from .observers import CashValueObserver
@@ -38,7 +39,53 @@ class Analyzer(LineObserver):
         plotoperations=True,
     )
 
+    _postonce = True  # only a container
+
     def __init__(self, *args, **kwargs):
-        self.cashvalue = CashValueObserver(plot=self.params.plotcashvalue)
-        self.operations = OperationsPnLObserver(plot=self.params.plotcashvalue)
-        self.buysell = BuySellObserver(plot=self.params.plotbuysell)
+        broker = self.params.broker
+        self.cashvalue = CashValueObserver(plot=self.params.plotcashvalue,
+                                           broker=broker)
+        self.operations = OperationsPnLObserver(plot=self.params.plotcashvalue,
+                                                broker=broker)
+        self.buysell = BuySellObserver(plot=self.params.plotbuysell,
+                                       broker=broker)
+
+
+class StreamAnalyzer(six.with_metaclass(MetaParams, object)):
+    '''
+    Base class for analyzers added with ``Cerebro.addanalyzer``. An instance
+    is created for each strategy, updates its statistics with each bar in
+    constant memory and reports them with ``getanalysis`` (a dict which can
+    be cheaply returned from optimization processes)
+
+    Methods called by the strategy:
+
+      - start: before the run starts
+      - notify(order): with each order notification
+      - next: with each bar, once the strategy logic has run
+      - stop: once the run has ended
+
+    Params:
+      - broker: the broker (account) to analyze. None: that of the strategy
+    '''
+    params = (('broker', None),)
+
+    strategy = None  # set by the strategy
+
+    def getbroker(self):
+        return self.params.broker or self.strategy.broker
+
+    def start(self):
+        pass
+
+    def notify(self, order):
+        pass
+
+    def next(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def getanalysis(self):
+        return dict()
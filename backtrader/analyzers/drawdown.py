@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from ..analyzer import StreamAnalyzer
+
+__all__ = ('DrawDown',)
+
+
+class DrawDown(StreamAnalyzer):
+    '''
+    Drawdown of the portfolio value from its running peak, in percentage and
+    money, and its length in bars. The maximum values are kept.
+
+    The percentage is only defined while the peak is positive (the value of
+    a broker can reach 0 or go negative): it is 0.0 otherwise
+    '''
+    def start(self):
+        self.peak = float('-inf')
+        self.drawdown = self.moneydown = 0.0
+        self.len = 0
+        self.maxdrawdown = self.maxmoneydown = 0.0
+        self.maxlen = 0
+
+    def next(self):
+        value = self.getbroker().getvalue()
+        if value >= self.peak:
+            self.peak = value
+            self.len = 0
+        else:
+            self.len += 1
+
+        self.moneydown = self.peak - value
+        if self.peak > 0.0:
+            self.drawdown = 100.0 * self.moneydown / self.peak
+        else:
+            self.drawdown = 0.0
+
+        self.maxdrawdown = max(self.maxdrawdown, self.drawdown)
+        self.maxmoneydown = max(self.maxmoneydown, self.moneydown)
+        self.maxlen = max(self.maxlen, self.len)
+
+    def getanalysis(self):
+        return dict(drawdown=self.drawdown, moneydown=self.moneydown,
+                    len=self.len, maxdrawdown=self.maxdrawdown,
+                    maxmoneydown=self.maxmoneydown, maxlen=self.maxlen)
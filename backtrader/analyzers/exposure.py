@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from ..analyzer import StreamAnalyzer
+
+__all__ = ('Exposure', 'Turnover',)
+
+
+class Exposure(StreamAnalyzer):
+    '''
+    Fraction of the bars in which the broker had at least one open position
+    '''
+    def start(self):
+        self.bars = 0
+        self.inmarket = 0
+
+    def next(self):
+        self.bars += 1
+        if self.getbroker().getopenpositions():
+            self.inmarket += 1
+
+    def getanalysis(self):
+        exposure = self.inmarket / self.bars if self.bars else None
+        return dict(exposure=exposure, bars=self.bars, inmarket=self.inmarket)
+
+
+class Turnover(StreamAnalyzer):
+    '''
+    Value traded (absolute size by price of the executions) divided by the
+    mean portfolio value
+    '''
+    def start(self):
+        self.traded = 0.0
+        self.bars = 0
+        self.meanvalue = 0.0
+        self.seen = dict()  # ref -> exbits already seen (partial fills)
+
+    def notify(self, order):
+        broker = self.getbroker()
+        if order.broker is not broker:
+            return
+
+        exbits = order.executed.exbits
+        for exbit in exbits[self.seen.pop(order.ref, 0):]:
+            self.traded += abs(exbit.size * exbit.price)
+
+        if order.alive():
+            self.seen[order.ref] = len(exbits)
+
+    def next(self):
+        self.bars += 1
+        value = self.getbroker().getvalue()
+        self.meanvalue += (value - self.meanvalue) / self.bars
+
+    def getanalysis(self):
+        turnover = self.traded / self.meanvalue if self.meanvalue else None
+        return dict(turnover=turnover, traded=self.traded,
+                    meanvalue=self.meanvalue)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+from ..analyzer import StreamAnalyzer
+
+__all__ = ('SharpeRatio', 'SortinoRatio',)
+
+
+class _ReturnsAnalyzer(StreamAnalyzer):
+    '''
+    Calculates the return of the portfolio value in each bar and hands it
+    over to ``addreturn``
+    '''
+    def start(self):
+        self.lastvalue = None
+
+    def next(self):
+        value = self.getbroker().getvalue()
+        if self.lastvalue:
+            self.addreturn(value / self.lastvalue - 1.0)
+
+        self.lastvalue = value
+
+    def addreturn(self, ret):
+        pass
+
+
+class SharpeRatio(_ReturnsAnalyzer):
+    '''
+    Sharpe ratio of the returns per bar, with a running mean and variance
+    (Welford's algorithm)
+
+    Params:
+      - riskfreerate: risk free rate per bar
+      - factor: number of bars per year to annualize the ratio (252 for
+        daily bars for example). None: not annualized
+    '''
+    params = (('riskfreerate', 0.0), ('factor', None),)
+
+    def start(self):
+        super(SharpeRatio, self).start()
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def addreturn(self, ret):
+        ret -= self.p.riskfreerate
+        self.count += 1
+        delta = ret - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (ret - self.mean)
+
+    def getanalysis(self):
+        stddev = sharpe = None
+        if self.count > 1:
+            stddev = math.sqrt(self.m2 / (self.count - 1))
+            if stddev:
+                sharpe = self.mean / stddev * math.sqrt(self.p.factor or 1.0)
+
+        return dict(sharperatio=sharpe, mean=self.mean, stddev=stddev,
+                    bars=self.count)
+
+
+class SortinoRatio(_ReturnsAnalyzer):
+    '''
+    Sortino ratio of the returns per bar: the mean return in excess of a
+    target divided by the downside deviation (root mean square of the
+    returns below the target)
+
+    Params:
+      - target: minimum acceptable return per bar
+      - factor: number of bars per year to annualize the ratio (252 for
+        daily bars for example). None: not annualized
+    '''
+    params = (('target', 0.0), ('factor', None),)
+
+    def start(self):
+        super(SortinoRatio, self).start()
+        self.count = 0
+        self.excess = 0.0
+        self.downsq = 0.0
+
+    def addreturn(self, ret):
+        ret -= self.p.target
+        self.count += 1
+        self.excess += ret
+        if ret < 0.0:
+            self.downsq += ret * ret
+
+    def getanalysis(self):
+        mean = downdev = sortino = None
+        if self.count:
+            mean = self.excess / self.count
+            downdev = math.sqrt(self.downsq / self.count)
+            if downdev:
+                sortino = mean / downdev * math.sqrt(self.p.factor or 1.0)
+
+        return dict(sortinoratio=sortino, mean=mean, downdev=downdev,
+                    bars=self.count)
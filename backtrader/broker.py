@@ -21,66 +21,376 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import array
+import bisect
 import collections
+import copy
+import heapq
+import itertools
+import math
 
 import six
 
 from .comminfo import CommissionInfo
-from .datapos import Position
+from .datapos import Operation, Position
+from .journal import OrderJournal
 from .metabase import MetaParams
 from .order import Order, BuyOrder, SellOrder
 
 
-class BrokerBack(six.with_metaclass(MetaParams, object)):
+class OrderBook(object):
+    '''
+    Holds the pending orders of a broker indexed by data and price to avoid
+    checking on each bar orders which cannot be executed.
+
+    For each data:
+
+      - Orders executed if the price goes down to a level (buy limit, sell
+        stop) are sorted by price. Only those with a price above the lower
+        end of the bar (minimum of open and low) may be executed
 
-    params = (('cash', 10000.0), ('commission', CommissionInfo()),)
+      - Orders executed if the price goes up to a level (sell limit, buy
+        stop) are sorted by price. Only those with a price below the upper
+        end of the bar (maximum of open and high) may be executed
+
+      - Orders with a validity are kept in a heap sorted by validity
+
+    Market and Close orders are checked on each bar.
+
+    Iterating yields the orders in submission order
+    '''
+    def __init__(self):
+        self.orders = collections.OrderedDict()  # ref -> order
+        self.always = collections.OrderedDict()  # ref -> order
+        self.lows = collections.defaultdict(list)
+        self.highs = collections.defaultdict(list)
+        self.expiries = collections.defaultdict(list)
+        self.expiring = dict()  # ref -> data of the orders in the heaps
+        self.dead = collections.defaultdict(int)  # data -> removed in heap
+        self.places = dict()  # ref -> (book, entry)
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __iter__(self):
+        return iter(list(self.orders.values()))
+
+    def __contains__(self, order):
+        return order.ref in self.orders
+
+    @staticmethod
+    def _place(order):
+        exectype = order.exectype
+        if exectype == Order.Limit or \
+           (exectype == Order.StopLimit and order.triggered):
+            price, lowside = order.created.pricelimit, order.isbuy()
+        elif exectype in (Order.Stop, Order.StopLimit):
+            price, lowside = order.created.price, not order.isbuy()
+        else:
+            return None
+
+        if price is None or math.isnan(price):
+            return None
+
+        return price, lowside
+
+    def _insert(self, order):
+        place = self._place(order)
+        if place is None:
+            self.always[order.ref] = order
+            book, entry = self.always, None
+        else:
+            price, lowside = place
+            book = (self.lows if lowside else self.highs)[order.data]
+            entry = (price, order.ref, order)
+            bisect.insort(book, entry)
+
+        self.places[order.ref] = (book, entry, place)
+
+    def _delete(self, order):
+        book, entry, place = self.places.pop(order.ref)
+        if entry is None:
+            del book[order.ref]
+        else:
+            del book[bisect.bisect_left(book, entry[:2])]
+
+    def append(self, order):
+        self.orders[order.ref] = order
+        self._insert(order)
+
+        if order.valid and order.exectype != Order.Market:
+            expiry = self.expiries[order.data]
+            heapq.heappush(expiry, (order.valid, order.ref, order))
+            self.expiring[order.ref] = order.data
+
+    def remove(self, order):
+        '''Removes the order. Returns False if the order was not pending'''
+        if self.orders.pop(order.ref, None) is None:
+            return False
+
+        self._delete(order)
+
+        # the entry stays in the expiry heap, which is rebuilt once more
+        # than half of it are removed orders
+        data = self.expiring.pop(order.ref, None)
+        if data is not None:
+            self.dead[data] += 1
+            expiry = self.expiries[data]
+            if self.dead[data] * 2 > len(expiry):
+                expiry[:] = [e for e in expiry if e[1] in self.expiring]
+                heapq.heapify(expiry)
+                self.dead[data] = 0
+
+        return True
+
+    def update(self, order):
+        '''Relocates or removes an order after it has been checked'''
+        if not order.alive():
+            self.remove(order)
+        elif self._place(order) != self.places[order.ref][2]:
+            # a stoplimit order triggered: now a limit order
+            self._delete(order)
+            self._insert(order)
+
+    @staticmethod
+    def _band(*prices):
+        prices = [p for p in prices if not math.isnan(p)]
+        return (min(prices), max(prices)) if prices else (None, None)
+
+    def candidates(self):
+        '''
+        Returns the orders which may be executed or expire with the current
+        bar of their datas, in submission order
+        '''
+        orders = list(self.always.values())
+
+        for data in set(self.lows) | set(self.highs):
+            lows, highs = self.lows[data], self.highs[data]
+            if not lows and not highs:
+                del self.lows[data], self.highs[data]
+                continue
+
+            bandlow, _ = self._band(data.open[0], data.low[0])
+            if bandlow is not None and lows:
+                idx = bisect.bisect_left(lows, (bandlow,))
+                orders.extend(entry[2] for entry in lows[idx:])
+
+            _, bandhigh = self._band(data.open[0], data.high[0])
+            if bandhigh is not None and highs:
+                idx = bisect.bisect_right(highs, (bandhigh, float('inf')))
+                orders.extend(entry[2] for entry in highs[:idx])
+
+        for data, expiry in self.expiries.items():
+            dt = data.datetime[0]
+            while expiry and expiry[0][0] < dt:
+                order = heapq.heappop(expiry)[2]
+                if self.expiring.pop(order.ref, None) is not None:
+                    orders.append(order)
+                else:
+                    self.dead[data] -= 1
+
+        orders = dict((order.ref, order) for order in orders)
+        return [orders[ref] for ref in sorted(orders)]
+
+
+class Positions(dict):
+    '''
+    Dictionary of positions keyed by data, which creates an empty position for
+    unknown datas (like a defaultdict) and records the order in which the
+    datas were added
+    '''
+    def __init__(self):
+        super(Positions, self).__init__()
+        self.order = dict()
+
+    def __missing__(self, data):
+        self.order[data] = len(self.order)
+        position = self[data] = Position()
+        return position
+
+
+class BrokerRecords(object):
+    '''
+    Cash and value of a broker at the end of each bar and, for each strategy
+    and data, what the observers need from the executions: the average buy and
+    sell prices of the bars with executions and the operations closed in them.
+    Recorded during a "once" run for the observers to fill their lines
+    afterwards
+    '''
+    def __init__(self):
+        self.cash = array.array(str('d'))
+        self.value = array.array(str('d'))
+        self._bar = dict()  # (owner, data) -> buy/sell prices of the bar
+        self._prices = dict()  # (owner, data) -> list of (bar, buy, sell)
+        self._operation = dict()  # (owner, data) -> open operation
+        self._closed = dict()  # (owner, data) -> list of (bar, operation)
+        self._seen = dict()  # (owner, data) -> {ref: exbits} partial fills
+
+    def addbar(self, cash, value):
+        bar = len(self.cash)
+        for key, (buy, sell) in self._bar.items():
+            self._prices.setdefault(key, []).append(
+                (bar,
+                 math.fsum(buy) / float(len(buy) or 'NaN'),
+                 math.fsum(sell) / float(len(sell) or 'NaN')))
+
+        self._bar = dict()
+        self.cash.append(cash)
+        self.value.append(value)
+
+    def notify(self, order):
+        '''Accounts the executions of order not yet seen'''
+        if not order.executed.size:
+            return
+
+        key = (order.owner, order.data)
+        seen = self._seen.setdefault(key, dict())
+        exbits = order.executed.exbits
+        start = seen.pop(order.ref, 0)
+        if order.alive():
+            seen[order.ref] = len(exbits)
+
+        prices = self._bar.setdefault(key, ([], []))[not order.isbuy()]
+        operation = self._operation.get(key)
+        if operation is None:
+            operation = Operation()
+
+        for exbit in exbits[start:]:
+            prices.append(exbit.price)
+            nextop = operation.execute(exbit)
+            if nextop is not operation:
+                self._closed.setdefault(key, []).append(
+                    (len(self.cash), operation))
+
+            operation = nextop
+
+        self._operation[key] = operation
+
+    def prices(self, owner, data):
+        '''Returns the list of (bar, buy, sell) average execution prices'''
+        return self._prices.get((owner, data), ())
+
+    def operations(self, owner, data):
+        '''
+        Returns the list of (bar, operation) of the closed operations and a
+        copy of the open operation (None if nothing has been executed)
+        '''
+        operation = self._operation.get((owner, data))
+        if operation is not None:
+            operation = copy.copy(operation)
+
+        return self._closed.get((owner, data), ()), operation
+
+    def seen(self, owner, data):
+        '''Returns {ref: exbits} of the partially executed orders'''
+        return dict(self._seen.get((owner, data), ()))
+
+
+class BrokerBack(six.with_metaclass(MetaParams, object)):
+    '''
+    Params:
+      - cash: starting cash
+      - commission: default commission scheme
+      - journal: path of a file to which the executions and final status of
+        the orders are streamed during the run (see ``OrderJournal``). Each
+        optimization combination is streamed to its own file
+      - maxorders: if not None, only the last ``maxorders`` orders are kept
+        in memory (by the broker and the strategies)
+      - checksubmit: check on submission that the cash not yet reserved by
+        other pending orders covers the cost of the order. If not, the order
+        is rejected with status ``Margin``
+      - filler: if not None, a fill model (see ``fillers``) which caps the
+        volume executed per data and bar. Orders are then executed in
+        price-time priority and may be partially filled across bars
+    '''
+    params = (('cash', 10000.0), ('commission', CommissionInfo()),
+              ('journal', None), ('maxorders', None), ('checksubmit', False),
+              ('filler', None),)
 
     def __init__(self):
         self.comminfo = dict()
+        self._comminfos = dict()  # data -> resolved comminfo
+        self.journal = None
         self.init()
 
     def init(self):
         if None not in self.comminfo.keys():
             self.comminfo = dict({None: self.p.commission})
 
-        self.startingcash = self.cash = self.p.cash
+        self._comminfos = dict()
 
-        self.orders = list()  # will only be appending
-        self.pending = collections.deque()  # popleft and append(right)
+        self.startingcash = self.cash = self.p.cash
 
-        self.positions = collections.defaultdict(Position)
+        # will only be appending (and forgetting the oldest if bounded)
+        if self.p.maxorders:
+            self.orders = collections.deque(maxlen=self.p.maxorders)
+        else:
+            self.orders = list()
+
+        self.pending = OrderBook()
+        self.reserved = 0.0  # cash committed to the pending orders
+        self._reserves = dict()  # ref -> (cash reserved, size)
+
+        self.positions = Positions()
+        self._openpos = dict()  # only the positions which are not flat
+        self._openlist = list()  # open datas in order of self.positions
+        self._marginlist = list()  # open datas with futures-like comminfo
+        self._value = None  # portfolio value cached for the current bar
+        self._volumes = dict()  # data -> volume left to fill in the bar
+        self.records = None  # BrokerRecords if recording
         self.notifs = collections.deque()
 
     def getcash(self):
         return self.cash
 
+    def startrecording(self):
+        '''Records from now on cash, value and executions bar by bar'''
+        if self.records is None:
+            self.records = BrokerRecords()
+
+    def stoprecording(self):
+        self.records = None
+
     def setcash(self, cash):
         self.startingcash = self.p.cash = cash
 
     def getcommissioninfo(self, data):
-        if data._name in self.comminfo:
-            return self.comminfo[data._name]
+        try:
+            return self._comminfos[data]  # resolved once per data
+        except KeyError:
+            pass
+
+        comminfo = self.comminfo.get(data._name, None)
+        if comminfo is None:
+            comminfo = self.comminfo[None]
 
-        return self.comminfo[None]
+        self._comminfos[data] = comminfo
+        return comminfo
 
     def setcommission(self, commission=0.0, margin=None, mult=1.0, name=None):
         comm = CommissionInfo(commission=commission, margin=margin, mult=mult)
-        self.comminfo[name] = comm
+        self.addcommissioninfo(comm, name=name)
 
     def addcommissioninfo(self, comminfo, name=None):
         self.comminfo[name] = comminfo
+        self._comminfos = dict()
+        self._value = None
+        self._updatemargin()
 
-    def start(self):
+    def start(self, combination=0):
         self.init()
 
+        if self.p.journal is not None:
+            self.journal = OrderJournal(self.p.journal)
+            self.journal.start(combination)
+
     def stop(self):
-        pass
+        if self.journal is not None:
+            self.journal.stop()
 
     def cancel(self, order):
-        try:
-            self.pending.remove(order)
-        except ValueError:
-            # If the list didn't have the element we didn't cancel anything
+        if not self.pending.remove(order):
+            # If the book didn't have the element we didn't cancel anything
             return False
 
         order.cancel()
@@ -88,8 +398,18 @@ class BrokerBack(six.with_metaclass(MetaParams, object)):
         return True
 
     def getvalue(self, datas=None):
+        if datas:
+            return self._getvalue(datas)
+
+        # Flat positions have no value: only the open ones are added up
+        if self._value is None:
+            self._value = self._getvalue(self._openlist)
+
+        return self._value
+
+    def _getvalue(self, datas):
         pos_value = 0.0
-        for data in datas or self.positions.keys():
+        for data in datas:
             comminfo = self.getcommissioninfo(data)
             position = self.positions[data]
             pos_value += comminfo.getvalue(position, data.close[0])
@@ -99,34 +419,107 @@ class BrokerBack(six.with_metaclass(MetaParams, object)):
     def getposition(self, data):
         return self.positions[data]
 
+    def getopenpositions(self):
+        '''Returns a dict (not to be modified) of the positions not flat'''
+        return self._openpos
+
     def submit(self, order):
-        # FIXME: When an order is submitted, a margin check
-        # requirement has to be done before it can be accepted. This implies
-        # going over the entire list of pending orders for all datas and
-        # existing positions, simulating order execution and ending up
-        # with a "cash" figure that can be used to check the margin requirement
-        # of the order. If not met, the order can be immediately rejected
-        order.accept()
         self.orders.append(order)
+
+        if self.p.checksubmit and not self._reserve(order):
+            order.margin()
+            self.notify(order)
+            return order
+
+        order.accept()
         self.pending.append(order)
         return order
 
+    def _reserve(self, order):
+        '''
+        Reserves the cash the order needs if it fits in the cash not reserved
+        by other pending orders. Returns False if it does not fit.
+
+        Only the part of the order which opens a position needs cash. The
+        price is the one given to the order or else the last close
+        '''
+        size = order.executed.remsize
+        possize = self.positions[order.data].size
+        if possize * size < 0:  # reduces (or reverses) the position
+            opening = max(0.0, abs(size) - abs(possize))
+        else:
+            opening = abs(size)
+
+        if not opening:
+            return True
+
+        price = order.created.price
+        if not price:
+            price = order.data.close[0]
+
+        comminfo = self.getcommissioninfo(order.data)
+        cost = comminfo.getoperationcost(opening, price) + \
+            comminfo.getcomm_pricesize(opening, price)
+
+        if cost > self.cash - self.reserved:
+            return False
+
+        self._reserves[order.ref] = (cost, size)
+        self.reserved += cost
+        return True
+
+    def _release(self, order):
+        '''
+        Releases the cash reserved for the part of the order which is no
+        longer pending
+        '''
+        reserve = self._reserves.pop(order.ref, None)
+        if reserve is None:
+            return
+
+        cost, size = reserve
+        self.reserved -= cost
+        if order.alive() and order.executed.remsize:
+            # partially executed: keep reserving for the remaining size
+            cost *= order.executed.remsize / size
+            self._reserves[order.ref] = (cost, order.executed.remsize)
+            self.reserved += cost
+
+        if not self._reserves:
+            self.reserved = 0.0  # no rounding residue if nothing is pending
+
     def buy(self, owner, data, size, price=None, exectype=None, valid=None):
         order = BuyOrder(owner=owner, data=data, size=size,
-                         price=price, exectype=exectype, valid=valid)
+                         price=price, exectype=exectype, valid=valid,
+                         broker=self)
         return self.submit(order)
 
     def sell(self, owner, data, size, price=None, exectype=None, valid=None):
         order = SellOrder(owner=owner, data=data, size=size,
-                          price=price, exectype=exectype, valid=valid)
+                          price=price, exectype=exectype, valid=valid,
+                          broker=self)
         return self.submit(order)
 
-    def _execute(self, order, dt, price):
-        # Orders are fully executed, get operation size
+    def _execute(self, order, dt, price, ago=0):
+        # Orders are fully executed unless a filler caps the size
         size = order.executed.remsize
+        if self.p.filler is not None:
+            size = self._fillsize(order, size, price, ago)
+            if not size:
+                return  # no volume left: remains pending
 
-        # Adjust position with operation size
+        # Adjust position and cash with operation size
         position = self.positions[order.data]
+        self.cash = self._settle(order, dt, size, price, position, self.cash)
+        self._updateopen(order.data, position)
+
+        self.notify(order)
+
+    def _settle(self, order, dt, size, price, position, cash):
+        '''
+        Updates position with the execution of size at price and executes
+        order. Returns cash adjusted for the execution
+        '''
         psize, pprice, opened, closed = position.update(size, price)
         abopened, abclosed = abs(opened), abs(closed)
 
@@ -136,98 +529,222 @@ class BrokerBack(six.with_metaclass(MetaParams, object)):
         if closed:
             # Adjust to returned value for closed items & acquired opened items
             closedvalue = comminfo.getoperationcost(abclosed, price)
-            self.cash += closedvalue
+            cash += closedvalue
             # Calculate and substract commission
             closedcomm = comminfo.getcomm_pricesize(abclosed, price)
-            self.cash -= closedcomm
+            cash -= closedcomm
             # Re-adjust cash according to future-like movements
             # Restore cash which was already taken at the start of the day
-            self.cash -= comminfo.cashadjust(abclosed,
-                                             price,
-                                             order.data.close[0])
+            cash -= comminfo.cashadjust(abclosed,
+                                        price,
+                                        order.data.close[0])
         else:
             closedvalue = closedcomm = 0.0
 
         if opened:
             openedvalue = comminfo.getoperationcost(abopened, price)
-            self.cash -= openedvalue
+            cash -= openedvalue
 
             openedcomm = comminfo.getcomm_pricesize(abopened, price)
-            self.cash -= openedcomm
+            cash -= openedcomm
 
             # Remove cash for the new opened contracts
-            self.cash += comminfo.cashadjust(abopened,
-                                             price,
-                                             order.data.close[0])
+            cash += comminfo.cashadjust(abopened,
+                                        price,
+                                        order.data.close[0])
         else:
             openedvalue = openedcomm = 0.0
 
-        # Execute and notify the order
+        # Execute the order
         order.execute(dt, size, price,
                       closed, closedvalue, closedcomm,
                       opened, openedvalue, openedcomm,
                       comminfo.margin, psize, pprice)
 
-        self.notify(order)
+        return cash
+
+    def _execgroup(self, orders):
+        '''
+        Executes a run of consecutive Market/Close orders (in submission order)
+        as a group. The positions and the cash are carried in running totals,
+        written back once per data and once for the group. The execution bits
+        and notifications are produced order by order
+        '''
+        cash = self.cash
+        running = dict()  # data -> (position, running position)
+        for order in orders:
+            if order.expire():
+                self.pending.remove(order)
+                self.notify(order)
+                continue
+
+            data = order.data
+            if order.exectype == Order.Market:
+                dt, price = data.datetime[0], data.open[0]
+            elif self._closeready(order):
+                dt, price = data.datetime[-1], data.close[-1]
+            else:
+                continue  # the session of the Close order is not over
+
+            positions = running.get(data)
+            if positions is None:
+                position = self.positions[data]
+                positions = running[data] = \
+                    (position, Position(position.size, position.price))
+
+            cash = self._settle(order, dt, order.executed.remsize, price,
+                                positions[1], cash)
+            self.notify(order)
+            self.pending.update(order)
+
+        self.cash = cash
+        for data, (position, runpos) in running.items():
+            position.size, position.price = runpos.size, runpos.price
+            self._updateopen(data, position)
+
+    def _fillsize(self, order, size, price, ago):
+        '''Takes the size to execute from the volume left for the data'''
+        volume = self._volumes.get(order.data)
+        if volume is None:
+            volume = self.p.filler(order, price, ago)
+
+        fill = min(abs(size), max(volume, 0))
+        self._volumes[order.data] = volume - fill
+        return fill if size > 0 else -fill
+
+    @staticmethod
+    def _priority(order):
+        '''
+        Sort key for price-time priority: market orders first and then the
+        orders with the most aggressive price, in submission order
+        '''
+        place = OrderBook._place(order)
+        if place is None:
+            return (0, 0.0, order.ref)
+
+        price, lowside = place
+        # limit buys/stop sells (lowside): the higher the price the earlier
+        return (1, -price if lowside else price, order.ref)
+
+    def _updateopen(self, data, position):
+        self._value = None  # cash and/or position have changed
+
+        if position.size:
+            if data in self._openpos:
+                return
+
+            self._openpos[data] = position
+
+        elif self._openpos.pop(data, None) is None:
+            return
+
+        # datas overload the comparison operators: do not search in lists
+        self._openlist = sorted(self._openpos,
+                                key=self.positions.order.__getitem__)
+        self._updatemargin()
+
+    def _updatemargin(self):
+        # Only futures-like positions need a daily cash adjustment
+        self._marginlist = [data for data in self._openlist
+                            if self.getcommissioninfo(data).margin]
 
     def notify(self, order):
+        self._release(order)
         self.notifs.append(order)
+        if self.journal is not None:
+            self.journal.notify(order)
+
+        if self.records is not None:
+            self.records.notify(order)
 
     def next(self):
-        for data, pos in self.positions.items():
+        self._value = None  # new bar: new prices
+        self._volumes = dict()
+
+        for data in self._marginlist:
             # futures change cash in the broker in every bar
             # to ensure margin requirements are met
             comminfo = self.getcommissioninfo(data)
-            self.cash += comminfo.cashadjust(pos.size,
+            self.cash += comminfo.cashadjust(self._openpos[data].size,
                                              data.close[-1],
                                              data.close[0])
 
-        # Iterate once over all elements of the pending queue
-        for i in range(len(self.pending)):
-            order = self.pending.popleft()
+        # Iterate only over the orders which may execute or expire
+        candidates = self.pending.candidates()
+        if self.p.filler is not None:
+            candidates.sort(key=self._priority)
 
+        if self.p.filler is not None:
+            self._execorders(candidates)  # the fills depend on each other
+        else:
+            # runs of orders executed at the bar prices go as a group
+            runs = itertools.groupby(candidates, key=self._grouped)
+            for grouped, orders in runs:
+                if grouped:
+                    self._execgroup(orders)
+                else:
+                    self._execorders(orders)
+
+        if self.records is not None:
+            self.records.addbar(self.cash, self.getvalue())
+
+    @staticmethod
+    def _grouped(order):
+        '''Returns True if order is executed by _execgroup'''
+        return order.exectype in (Order.Market, Order.Close)
+
+    def _execorders(self, orders):
+        '''Executes (or expires) orders one after the other'''
+        for order in orders:
             if order.expire():
+                self.pending.remove(order)
                 self.notify(order)
                 continue
 
-            plow = order.data.low[0]
-            phigh = order.data.high[0]
-            popen = order.data.open[0]
-            pclose = order.data.close[0]
-            pclose1 = order.data.close[-1]
-            pcreated = order.created.price
-            plimit = order.created.pricelimit
+            self._try_exec(order)
+            self.pending.update(order)
 
-            if order.exectype == Order.Market:
-                self._execute(order, order.data.datetime[0], price=popen)
+    def _try_exec(self, order):
+        plow = order.data.low[0]
+        phigh = order.data.high[0]
+        popen = order.data.open[0]
+        pclose = order.data.close[0]
+        pclose1 = order.data.close[-1]
+        pcreated = order.created.price
+        plimit = order.created.pricelimit
 
-            elif order.exectype == Order.Close:
-                self._try_exec_close(order, pclose1)
+        if order.exectype == Order.Market:
+            self._execute(order, order.data.datetime[0], price=popen)
 
-            elif order.exectype == Order.Limit:
-                self._try_exec_limit(order, popen, phigh, plow, plimit)
+        elif order.exectype == Order.Close:
+            self._try_exec_close(order, pclose1)
 
-            elif order.exectype == Order.StopLimit and order.triggered:
-                self._try_exec_limit(order, popen, phigh, plow, plimit)
+        elif order.exectype == Order.Limit:
+            self._try_exec_limit(order, popen, phigh, plow, plimit)
 
-            elif order.exectype == Order.Stop:
-                self._try_exec_stop(order, popen, phigh, plow, pcreated)
+        elif order.exectype == Order.StopLimit and order.triggered:
+            self._try_exec_limit(order, popen, phigh, plow, plimit)
 
-            elif order.exectype == Order.StopLimit:
-                self._try_exec_stoplimit(order,
-                                         popen, phigh, plow, pclose,
-                                         pcreated, plimit)
+        elif order.exectype == Order.Stop:
+            self._try_exec_stop(order, popen, phigh, plow, pcreated)
 
-            if order.alive():
-                self.pending.append(order)
+        elif order.exectype == Order.StopLimit:
+            self._try_exec_stoplimit(order,
+                                     popen, phigh, plow, pclose,
+                                     pcreated, plimit)
 
     def _try_exec_close(self, order, pclose):
-        if order.data.datetime.time(0) != order.data.datetime.time(-1):
-            # intraday: time changes in between bars
-            self._execute(order, order.data.datetime[-1], price=pclose)
-        elif order.data.datetime.date(0) != order.data.datetime.date(-1):
-            # daily: time is equal, date changes
-            self._execute(order, order.data.datetime[-1], price=pclose)
+        if self._closeready(order):
+            self._execute(order, order.data.datetime[-1], price=pclose, ago=-1)
+
+    @staticmethod
+    def _closeready(order):
+        '''Returns True if the session of the bar before has finished'''
+        dtime = order.data.datetime
+        # intraday: time changes in between bars
+        # daily: time is equal, date changes
+        return (dtime.time(0) != dtime.time(-1) or
+                dtime.date(0) != dtime.date(-1))
 
     def _try_exec_limit(self, order, popen, phigh, plow, plimit):
         if isinstance(order, BuyOrder):
@@ -293,7 +810,7 @@ class BrokerBack(six.with_metaclass(MetaParams, object)):
             if popen <= pcreated:
                 # price penetrated downwards with an open gap
                 order.triggered = True
-                if plimit <= open:
+                if plimit <= popen:
                     self._execute(order, order.data.datetime[0], price=popen)
                 elif plimit <= phigh:
                     # execute in same bar
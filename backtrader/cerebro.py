@@ -23,12 +23,16 @@ from __future__ import (absolute_import, division, print_function,
 
 import collections
 import itertools
+import multiprocessing.pool
 
 import six
 from six.moves import xrange
 
 from .broker import BrokerBack
+from .indcache import IndicatorCache
+from .linebuffer import BufferPool
 from .metabase import MetaParams
+from .strategy import StrategyResult
 
 
 class Cerebro(six.with_metaclass(MetaParams, object)):
@@ -37,13 +41,25 @@ class Cerebro(six.with_metaclass(MetaParams, object)):
         ('preload', True),
         ('runonce', True),
         ('lookahead', 0),
+        ('indcache', 0),
+        ('indcachedir', None),
+        ('oncethreads', 0),
+        ('compact', False),
+        ('nextcompile', True),
+        ('fuse', True),
+        ('postonce', False),
     )
 
     def __init__(self):
         self.feeds = list()
         self.datas = list()
         self.strats = list()
+        self.analyzers = list()
+        self.runstrats = list()
         self._broker = BrokerBack()
+        self.brokers = [self._broker]  # the 1st one is the default broker
+        self._indcache = None
+        self._oncepool = None
 
     @staticmethod
     def iterize(iterable):
@@ -86,8 +102,25 @@ class Cerebro(six.with_metaclass(MetaParams, object)):
     def addstrategy(self, strategy, *args, **kwargs):
         self.strats.append([(strategy, args, kwargs)])
 
+    def addanalyzer(self, ancls, *args, **kwargs):
+        '''
+        Adds an analyzer (a subclass of ``StreamAnalyzer``) which is
+        instantiated with the given arguments for each strategy
+        '''
+        self.analyzers.append((ancls, args, kwargs))
+
     def setbroker(self, broker):
-        self._broker = broker
+        self._broker = self.brokers[0] = broker
+        return broker
+
+    def addbroker(self, broker):
+        '''
+        Adds an additional broker (account) which runs alongside the default
+        one over the same datas and indicators. Strategies send orders to it
+        with the ``broker`` argument of ``buy``/``sell``/``close`` and find
+        it in ``self.brokers``
+        '''
+        self.brokers.append(broker)
         return broker
 
     def getbroker(self):
@@ -109,53 +142,146 @@ class Cerebro(six.with_metaclass(MetaParams, object)):
         if not self.datas:
             return
 
-        for iterstrat in itertools.product(*self.strats):
-            self.runstrats = list()
+        runonce = self.params.preload and self.params.runonce
+        if runonce and (self.params.indcache or self.params.indcachedir):
+            # memory budget in bytes, shared by all optimization combinations
+            self._indcache = IndicatorCache(self.params.indcache,
+                                            self.params.indcachedir)
+
+        if runonce and self.params.oncethreads > 1:
+            # independent indicators are calculated concurrently
+            self._oncepool = \
+                multiprocessing.pool.ThreadPool(self.params.oncethreads)
+
+        results = list()  # compact mode: the outcome of each combination
+        bufpool = None
+        if self.params.compact:
+            # the released buffers are reused by the next combination
+            bufpool = BufferPool()
+            for data in self.datas:
+                data.lines.setbufpool(bufpool)
+
+        try:
+            combinations = itertools.product(*self.strats)
+            for combination, iterstrat in enumerate(combinations):
+                self.runstrats = list()
+
+                for broker in self.brokers:
+                    broker.start(combination)
+
+                for feed in self.feeds:
+                    feed.start()
+
+                for data in self.datas:
+                    data.reset()
+                    data.extend(size=self.params.lookahead)
+                    data.start()
+                    if self.params.preload:
+                        data.preload()
+
+                for stratcls, sargs, skwargs in iterstrat:
+                    sargs = self.datas + list(sargs)
+                    strat = stratcls(self, *sargs, **skwargs)
+                    self.runstrats.append(strat)
+                    if bufpool is not None:
+                        strat._setbufpool(bufpool)
+
+                # loop separated for clarity
+                for strat in self.runstrats:
+                    strat._start()
+
+                if self.params.preload and self.params.runonce:
+                    self._runonce()
+                else:
+                    self._runnext()
+
+                for strat in self.runstrats:
+                    strat._stop()
+
+                if self.params.compact:
+                    results.append([StrategyResult(s) for s in self.runstrats])
+                    for strat in self.runstrats:
+                        strat._release()
+
+                    self.runstrats = list()
+
+                for broker in self.brokers:
+                    broker.stop()
+
+                for data in self.datas:
+                    data.stop()
+
+                for feed in self.feeds:
+                    feed.stop()
+        finally:
+            # also when a strategy, indicator or feed raises
+            self._indcache = None
+            if self._oncepool is not None:
+                self._oncepool.close()
+                self._oncepool.join()
+                self._oncepool = None
+
+            if bufpool is not None:
+                for data in self.datas:
+                    data.lines.setbufpool(None)
+
+        if self.params.compact:
+            return results
 
-            self._broker.start()
+        return self.runstrats
 
-            for feed in self.feeds:
-                feed.start()
+    def resume(self):
+        '''
+        Carries on with the strategies of the last run over the bars which
+        have been appended to the datas after the run finished.
 
-            for data in self.datas:
-                data.reset()
-                data.extend(size=self.params.lookahead)
-                data.start()
-                if self.params.preload:
-                    data.preload()
-
-            for stratcls, sargs, skwargs in iterstrat:
-                sargs = self.datas + list(sargs)
-                strat = stratcls(self, *sargs, **skwargs)
-                self.runstrats.append(strat)
-
-            # loop separated for clarity
-            for strat in self.runstrats:
-                strat.start()
+        The bars are delivered with ``next`` semantics and the broker,
+        strategies, indicators and observers keep their state
+        '''
+        if not self.runstrats:
+            return self.runstrats
 
-            if self.params.preload and self.params.runonce:
-                self._runonce()
-            else:
-                self._runnext()
+        for strat in self.runstrats:
+            strat._resume()
 
-            for strat in self.runstrats:
-                strat.stop()
+        for data in self.datas:
+            data.resume()
 
-            for data in self.datas:
-                data.stop()
+        self._runnext()
 
-            for feed in self.feeds:
-                feed.stop()
+        for strat in self.runstrats:
+            strat._stop()
+
+        for broker in self.brokers:
+            broker.stop()
+
+        for data in self.datas:
+            data.stop()
+
+        for feed in self.feeds:
+            feed.stop()
 
         return self.runstrats
 
+    def export(self, fmt=None):
+        '''
+        Returns the export of the lines (see ``Strategy.export``) of each
+        strategy of the last run
+        '''
+        return [strat.export(fmt=fmt) for strat in self.runstrats]
+
     def _brokernotify(self):
-        self._broker.next()
-        while self._broker.notifs:
-            order = self._broker.notifs.popleft()
-            order.owner._addnotification(order)
+        for broker in self.brokers:
+            broker.next()
+            while broker.notifs:
+                order = broker.notifs.popleft()
+                order.owner._addnotification(order)
 
     def _runnext(self):
+        if self.params.nextcompile:
+            for strat in self.runstrats:
+                strat._nextcompile()
+
         data0 = self.datas[0]
         while data0.next():
             for data in self.datas[1:]:
@@ -169,6 +295,8 @@ class Cerebro(six.with_metaclass(MetaParams, object)):
     def _runonce(self):
         for strat in self.runstrats:
             strat._once()
+            if self.params.postonce:
+                strat._deferobservers()
 
         # The default once for strategies does nothing and therefore
         # has not moved forward all datas/indicators/observers that
@@ -185,3 +313,9 @@ class Cerebro(six.with_metaclass(MetaParams, object)):
 
             for strat in self.runstrats:
                 strat._oncepost()
+
+        for strat in self.runstrats:
+            strat._postonce()
+
+        for broker in self.brokers:
+            broker.stoprecording()
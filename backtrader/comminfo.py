@@ -56,6 +56,13 @@ class CommissionInfo(six.with_metaclass(MetaParams)):
 
     params = (('commission', 0.0), ('mult', 1.0), ('margin', None),)
 
+    def __init__(self):
+        # Plain attributes are read in the hot paths of the broker without
+        # going through __getattr__ and the params
+        self.commission = self.params.commission
+        self.mult = self.params.mult
+        self.margin = self.params.margin
+
     def __getattr__(self, name):
         # dig into self.params if not attribute, mostly for external access
         return getattr(self.params, name)
@@ -213,3 +213,25 @@ class Operation(object):
             self.pnlcomm = self.pnl - self.commission
 
         self.value = self.size * self.price
+
+    def execute(self, exbit):
+        '''
+        Updates the operation with the execution bit of an order: first with
+        the closed and then with the opened part.
+
+        Returns the operation which carries the opened part: a new one if the
+        closed part has closed this one
+        '''
+        self.update(exbit.closed,
+                    exbit.price,
+                    exbit.closedvalue,
+                    exbit.closedcomm)
+
+        # Open the next operation if this one has been closed
+        operation = Operation() if self.isclosed else self
+        operation.update(exbit.opened,
+                         exbit.price,
+                         exbit.openedvalue,
+                         exbit.openedcomm)
+
+        return operation
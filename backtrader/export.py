@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+
+.. module:: export
+
+Columnar export of the lines of a strategy (datas, indicators and observers)
+after a run.
+
+The columns are views (``memoryview``) of the line buffers whenever they are
+aligned with the main data (the clock of the strategy). Columns of objects
+running on other timeframes are aligned to the datetime of the main data
+(the last known value is carried) and are therefore copies.
+
+.. note:: While a ``memoryview`` of a buffer is alive, the buffer cannot be
+          enlarged (by ``Cerebro.resume``). Release the views first
+
+.. moduleauthor:: Daniel Rodriguez
+
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import collections
+
+from .feed import DataBase
+from .linebuffer import LineActions, NAN
+from .linegraph import LazyArray
+from .lineiterator import LineIterator
+from .lineseries import LineSeriesStub
+from .utils import num2date
+
+
+def _view(larray, size):
+    if isinstance(larray, LazyArray):
+        larray = larray._array()  # calculated on demand
+
+    try:
+        return memoryview(larray)[:size]
+    except TypeError:  # Python 2: arrays do not support memoryview
+        return larray[:size]
+
+
+def _clockdata(obj):
+    '''Returns the data feed which ultimately drives obj'''
+    while obj is not None and not isinstance(obj, DataBase):
+        if isinstance(obj, LineSeriesStub):
+            obj = obj.owner
+        elif isinstance(obj, LineActions):
+            obj = obj._owner
+        else:
+            obj = getattr(obj, '_clock', None)
+
+    return obj
+
+
+def _align(master, dts, values):
+    '''Aligns values (with datetimes dts) to the master datetimes'''
+    aligned = array.array(str('d'))
+    last, j, count = NAN, 0, min(len(dts), len(values))
+    for dt in master:
+        while j < count and dts[j] <= dt:
+            last = values[j]
+            j += 1
+
+        aligned.append(last)
+
+    return aligned
+
+
+def _lines(obj):
+    if isinstance(obj, LineActions):
+        return [('', obj)]
+
+    lines = list()
+    for i, line in enumerate(obj.lines):
+        alias = obj.lines._getlinealias(i)
+        if alias:
+            lines.append(('.' + alias, line))
+
+    return lines
+
+
+def _names(strategy, objs, default):
+    # objects kept as attributes of the strategy are named after them
+    attrs = dict()
+    for name, value in vars(strategy).items():
+        if not name.startswith('_'):
+            attrs.setdefault(id(value), name)
+
+    names = list()
+    counts = collections.defaultdict(int)
+    for obj in objs:
+        name = attrs.get(id(obj))
+        if name is None:
+            name = default(obj).lstrip('_')
+            counts[name] += 1
+            if counts[name] > 1:
+                name += str(counts[name] - 1)
+
+        names.append(name)
+
+    return names
+
+
+def _obsname(obs):
+    name = obs.__class__.__name__
+    data = getattr(obs, 'data', None)
+    if data is not None and 'data' in vars(obs):  # one observer per data
+        name += '_' + (data._name or 'data')
+
+    return name
+
+
+def export(strategy, fmt=None):
+    '''
+    Returns an OrderedDict of name -> values with the lines of the datas,
+    indicators and observers of strategy. The first column, ``datetime``,
+    holds the datetime (as a float) of the main data
+
+    Args:
+      - fmt: None for views of the buffers, ``'numpy'`` for numpy arrays
+        (without copying the buffers) or ``'pandas'`` for a DataFrame indexed
+        by datetime. The DataFrame holds a copy of the values: pandas
+        combines the columns into a single block of its own
+    '''
+    clock = strategy.datas[0]
+    size = len(strategy)
+    master = _view(clock.datetime.array, size)
+
+    cols = collections.OrderedDict()
+    cols['datetime'] = master
+
+    alignments = dict()  # id(data) -> buffers aligned with the clock
+
+    def isaligned(data):
+        if data is None or data is clock:
+            return True
+
+        aligned = alignments.get(id(data))
+        if aligned is None:
+            aligned = alignments[id(data)] = len(data) == size and \
+                data.datetime.array[:size] == clock.datetime.array[:size]
+
+        return aligned
+
+    def addcols(obj, name):
+        data = _clockdata(obj)
+        aligned = isaligned(data)
+        for suffix, line in _lines(obj):
+            if aligned:
+                values = _view(line.array, size)
+            else:
+                values = _align(master, data.datetime.array[:len(data)],
+                                line.array[:len(data)])
+
+            cols[name + suffix] = values
+
+    for i, data in enumerate(strategy.datas):
+        addcols(data, data._name or 'data%d' % i)
+
+    for ltype, default in ((LineIterator.IndType, lambda o: type(o).__name__),
+                           (LineIterator.ObsType, _obsname)):
+        objs = strategy._lineiterators[ltype]
+        for obj, name in zip(objs, _names(strategy, objs, default)):
+            addcols(obj, name)
+
+    if fmt is None:
+        return cols
+
+    import numpy as np  # optional dependencies
+
+    npcols = collections.OrderedDict()
+    for name, values in cols.items():
+        npcols[name] = np.frombuffer(values, dtype=np.float64)
+
+    if fmt == 'numpy':
+        return npcols
+
+    import pandas as pd
+
+    index = pd.DatetimeIndex([num2date(x) for x in npcols.pop('datetime')],
+                             name='datetime')
+    return pd.DataFrame(npcols, index=index)
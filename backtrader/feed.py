@@ -76,6 +76,7 @@ class MetaDataBase(dataseries.OHLCDateTime.__class__):
 
 class DataBase(six.with_metaclass(MetaDataBase, dataseries.OHLCDateTime)):
     _feed = None
+    _lastdt = None
 
     params = (('dataname', None),
               ('fromdate', datetime.datetime.min),
@@ -94,6 +95,16 @@ class DataBase(six.with_metaclass(MetaDataBase, dataseries.OHLCDateTime)):
     def stop(self):
         pass
 
+    def resume(self):
+        '''
+        Starts the data again to deliver only the bars which come after the
+        last bar already held in the buffer
+        '''
+        if self.buflen():
+            self._lastdt = self.lines.datetime[self.buflen() - len(self)]
+
+        self.start()
+
     def advance(self, datamaster=None):
         # Need intercepting this call to support datas with
         # different lengths (timeframes)
@@ -158,6 +169,10 @@ class DataBase(six.with_metaclass(MetaDataBase, dataseries.OHLCDateTime)):
                 # discard loaded bar and carry on
                 self.backwards()
                 continue
+            if self._lastdt is not None and dt <= self._lastdt:
+                # already delivered before resuming - carry on
+                self.backwards()
+                continue
             if dt > self.todate:
                 # discard loaded bar and break out
                 self.backwards()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+
+.. module:: fillers
+
+Fill models for the broker. A filler is a callable which receives the first
+order of a data to be executed in a bar, the execution price and the "ago" of
+the bar (0 for the current bar, -1 if the order executes with the previous
+close) and returns the volume the broker can fill for the data in the bar.
+
+The volume is shared by all orders of the data executed in the bar, which take
+it in price-time priority. What cannot be filled remains pending for the
+following bars (status ``Partial``)
+
+.. moduleauthor:: Daniel Rodriguez
+
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import six
+
+from .metabase import MetaParams
+
+
+class FixedSize(six.with_metaclass(MetaParams, object)):
+    '''
+    Fills at most ``size`` units of a data per bar
+    '''
+    params = (('size', 1),)
+
+    def __call__(self, order, price, ago):
+        return self.params.size
+
+
+class FixedBarPerc(six.with_metaclass(MetaParams, object)):
+    '''
+    Fills at most ``perc`` percent of the volume of the bar (in whole units)
+    '''
+    params = (('perc', 100.0),)
+
+    def __call__(self, order, price, ago):
+        return (order.data.volume[ago] * self.params.perc) // 100
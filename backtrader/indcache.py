@@ -0,0 +1,522 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+
+.. module:: indcache
+
+Cache for the values calculated by indicators in "once" mode. The cache allows
+the different combinations of an optimization to reuse the results of
+indicators which only depend on the datas and on parameters which are not being
+optimized.
+
+The values can also be persisted to a directory to be reused by later
+runs over the same datas. If bars have only been appended to the datas, only
+the new bars have to be calculated
+
+.. moduleauthor:: Daniel Rodriguez
+
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+try:
+    from collections import OrderedDict
+except ImportError:
+    from .utils.ordereddict import OrderedDict
+import hashlib
+import json
+import os
+import os.path
+import threading
+import types
+
+import six
+
+from .linebuffer import (LineBuffer, LineActions, LineDelay, LinesOperation,
+                         LineOwnOperation)
+from .lineroot import LineRoot
+from .lineseries import LineSeries, LineSeriesStub
+from .lineiterator import LineIterator, IndicatorBase
+
+
+class NoCacheKey(Exception):
+    '''Raised when an object cannot be given a stable key'''
+    pass
+
+
+class DataKey(object):
+    '''
+    Key component standing for a data feed. It compares by identity of the
+    data feed, which lives during the entire run, but keeps a reference to
+    it to be able to fingerprint its contents for the on-disk cache
+    '''
+    def __init__(self, data):
+        self.data = data
+
+    def __hash__(self):
+        return id(self.data)
+
+    def __eq__(self, other):
+        return isinstance(other, DataKey) and other.data is self.data
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+def cachekey(obj):
+    '''
+    Returns a hashable key which identifies the values produced by ``obj``
+    during a run, or None if no such key can be calculated
+
+    The key is built from the class of the object, its parameters and the
+    keys of the objects it takes its input from, recursing down to the datas.
+    The key is stored in the object to calculate it only once
+    '''
+    try:
+        return _cachekey(obj)
+    except NoCacheKey:
+        return None
+
+
+def _cachekey(obj):
+    try:
+        key = obj._cachekey
+    except AttributeError:
+        key = None
+
+    if key is None:
+        try:
+            key = _makekey(obj)
+        except NoCacheKey:
+            key = NoCacheKey
+
+        if not _building():
+            # inside a composite keys may refer to the composite being keyed
+            obj._cachekey = key
+
+    if key is NoCacheKey:
+        raise NoCacheKey
+
+    return key
+
+
+def _makekey(obj):
+    if isinstance(obj, LineSeriesStub):
+        return _cachekey(obj.lines[0])
+
+    if isinstance(obj, IndicatorBase):
+        if not _cacheable(obj):
+            raise NoCacheKey
+
+        params = tuple(_freeze(v) for v in obj.params._getvalues())
+        args, kwargs = getattr(obj, '_initargs', ((), {}))
+        args = (_freeze(args), _freeze(sorted(kwargs.items())))
+        datas = tuple(_cachekey(d) for d in obj.datas)
+        key = (obj.__class__, params, args, datas)
+        if iscomposite(obj):
+            # __init__ may have used anything (like values of the owner) to
+            # build the sources of the lines: these make the key. Sources
+            # may read other lines of obj, which are keyed by the above
+            building = _building()
+            building.append((obj, key))
+            try:
+                sources = [_boundsource(obj, line) for line in obj.lines]
+            finally:
+                building.pop()
+
+            key += (tuple(sources),)
+
+        return key
+
+    if isinstance(obj, LineIterator):
+        # Strategies and Observers: things like the broker play a role
+        raise NoCacheKey
+
+    if isinstance(obj, LineSeries):
+        # A data feed: the object itself lives during the entire run
+        return DataKey(obj)
+
+    if isinstance(obj, LineDelay):
+        return (LineDelay, _cachekey(obj.a), obj.ago)
+
+    if isinstance(obj, LinesOperation):
+        return (LinesOperation, obj.operation,
+                _freeze(obj.a), _freeze(obj.b))
+
+    if isinstance(obj, LineOwnOperation):
+        return (LineOwnOperation, obj.operation, _cachekey(obj.a))
+
+    if isinstance(obj, LineActions):
+        # Unknown action: the inputs cannot be found out
+        raise NoCacheKey
+
+    if isinstance(obj, LineBuffer):
+        owner = obj._owner
+        for building, key in _building():
+            if building is owner:
+                for i, line in enumerate(owner.lines):
+                    if line is obj:
+                        return ('building', key, i)
+
+        if owner is not None:
+            for i, line in enumerate(owner.lines):
+                if line is obj:
+                    return (_cachekey(owner), i)
+
+    raise NoCacheKey
+
+
+_local = threading.local()
+
+
+def _building():
+    '''Composite indicators whose key is being made (in this thread)'''
+    try:
+        return _local.building
+    except AttributeError:
+        _local.building = list()
+        return _local.building
+
+
+def iscomposite(obj):
+    '''
+    Returns True if obj is an indicator which only combines other indicators
+    and operations in __init__ (it has no once/preonce of its own)
+    '''
+    # Imported here to avoid a circular import
+    from .indicator import Indicator
+
+    return (isinstance(obj, Indicator) and
+            type(obj).once == Indicator.once_empty and
+            type(obj).preonce == Indicator.preonce_empty)
+
+
+def _cacheable(obj):
+    '''
+    Indicators can say whether they are cached with the class attribute
+    ``_cacheable``. By default composite indicators (whose lines are bound to
+    the lines of sub-indicators and operations) are cached, because the key
+    is made from the sources of the lines. Indicators with their own
+    calculation logic are only cached if they are part of backtrader: the
+    logic of others may depend on anything (like values of the owner)
+    '''
+    cacheable = getattr(obj, '_cacheable', None)
+    if cacheable is not None:
+        return cacheable
+
+    if iscomposite(obj):
+        return True
+
+    return type(obj).__module__.split('.')[0] == 'backtrader'
+
+
+def _boundsource(obj, line):
+    '''Key of the line of a sub-indicator/operation bound to line'''
+    for sub in obj._lineiterators[LineIterator.IndType]:
+        if isinstance(sub, LineActions):
+            if any(binding is line for binding in sub.bindings):
+                return _cachekey(sub)
+
+            continue
+
+        for i, srcline in enumerate(sub.lines):
+            if any(binding is line for binding in srcline.bindings):
+                return (_cachekey(sub), i)
+
+    return None
+
+
+def _freeze(value):
+    '''Turns a parameter/operand value into something stable and hashable'''
+    if isinstance(value, LineRoot):
+        return _cachekey(value)
+
+    if value is None or isinstance(value, (bool, float, six.binary_type) +
+                                   six.integer_types + six.string_types):
+        return value
+
+    if isinstance(value, (type, types.BuiltinFunctionType)):
+        return value
+
+    if isinstance(value, types.FunctionType):
+        # Module level functions live during the entire run. Lambdas and
+        # closures may be created anew with each instance
+        name = getattr(value, '__qualname__', value.__name__)
+        if '<' not in name:
+            return value
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+
+    raise NoCacheKey
+
+
+def _keystr(key):
+    '''Returns a representation of a key which is stable across processes'''
+    if isinstance(key, tuple):
+        return '(' + ','.join(_keystr(k) for k in key) + ')'
+
+    if isinstance(key, DataKey):
+        return 'data:' + _dataident(key.data)
+
+    if isinstance(key, (type, types.BuiltinFunctionType, types.FunctionType)):
+        name = getattr(key, '__qualname__', key.__name__)
+        return '%s.%s' % (getattr(key, '__module__', None), name)
+
+    return repr(key)
+
+
+def _dataident(data):
+    '''Identifies a data feed by its class and parameters'''
+    ident = _keystr(data.__class__)
+    ident += _keystr(tuple(repr(v) for v in data.params._getvalues()))
+
+    # resamplers/replayers take the actual data as source
+    source = getattr(data, 'data', None)
+    if isinstance(source, LineSeries):
+        ident += '<-' + _dataident(source)
+
+    return ident
+
+
+def _keyfeeds(key, feeds=None):
+    '''Returns the data feeds found in a key, in order of appearance'''
+    if feeds is None:
+        feeds = list()
+
+    if isinstance(key, tuple):
+        for k in key:
+            _keyfeeds(k, feeds)
+
+    elif isinstance(key, DataKey):
+        if not any(key.data is f for f in feeds):
+            feeds.append(key.data)
+
+    return feeds
+
+
+def _tobytes(arr):
+    try:
+        return arr.tobytes()
+    except AttributeError:
+        return arr.tostring()  # Python 2
+
+
+class DataFingerprint(object):
+    '''
+    Summarizes the contents of a data feed: the source file (if any), the
+    number of bars and a hash of the first and last bars.
+
+    A stored fingerprint matches a data feed if the bars it summarizes are
+    still at the start of the data feed, which is the case when the data feed
+    is the same or bars have only been appended to it
+    '''
+    hashbars = 16
+
+    @classmethod
+    def _hash(cls, data, start, end):
+        h = hashlib.sha1()
+        for line in data.lines:
+            h.update(_tobytes(line.array[start:end]))
+
+        return h.hexdigest()
+
+    @classmethod
+    def create(cls, data):
+        dataname = data.params.dataname
+        if isinstance(dataname, six.string_types) and os.path.isfile(dataname):
+            path, mtime = dataname, os.path.getmtime(dataname)
+        else:
+            path, mtime = None, None
+
+        rows = data.buflen()
+        return dict(path=path, mtime=mtime, rows=rows,
+                    head=cls._hash(data, 0, min(rows, cls.hashbars)),
+                    tail=cls._hash(data, max(0, rows - cls.hashbars), rows))
+
+    @classmethod
+    def matches(cls, data, fp):
+        rows = fp['rows']
+        if data.buflen() < rows:
+            return False
+
+        if fp['head'] != cls._hash(data, 0, min(rows, cls.hashbars)):
+            return False
+
+        return fp['tail'] == cls._hash(data, max(0, rows - cls.hashbars), rows)
+
+
+class IndicatorCache(object):
+    '''
+    Stores the line buffers calculated by indicators in "once" mode with a
+    Least Recently Used eviction policy.
+
+    Params:
+      - maxsize: memory budget (in bytes) for the stored buffers
+      - cachedir: if not None, the buffers are also stored in this directory
+        together with the fingerprints of the datas they were calculated from
+        and can be loaded back by later runs
+
+    Attributes:
+      - hits: number of times an indicator got its values from the cache
+      - misses: number of times an indicator had to calculate its values
+
+    The on-disk format is a line with a JSON header (key, fingerprints of
+    the data feeds and typecode/length of each line) followed by the raw
+    contents of each line buffer, one after the other
+    '''
+
+    def __init__(self, maxsize=0, cachedir=None):
+        self.maxsize = maxsize
+        self.cachedir = cachedir
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._store = OrderedDict()
+        self._lock = threading.Lock()  # indicators may run in threads
+
+        if cachedir is not None and not os.path.isdir(cachedir):
+            os.makedirs(cachedir)
+
+    def __len__(self):
+        return len(self._store)
+
+    @staticmethod
+    def _arrsize(arrays):
+        return sum(len(a) * a.itemsize for a in arrays)
+
+    def load(self, key, indicator):
+        '''
+        Copies the stored buffers into the lines of ``indicator``. Returns
+        the number of values which were restored, 0 if nothing was found
+        in the cache.
+
+        Values restored from disk may be less than the length of the clock of
+        the indicator if bars have been appended to the datas
+        '''
+        with self._lock:
+            return self._load(key, indicator)
+
+    def save(self, key, indicator):
+        '''
+        Stores a copy of the buffers of the lines of ``indicator``
+        '''
+        with self._lock:
+            self._save(key, indicator)
+
+    def _load(self, key, indicator):
+        arrays = self._store.pop(key, None)
+        if arrays is not None:
+            self._store[key] = arrays  # reinsert as most recently used
+        elif self.cachedir is not None:
+            arrays = self._diskload(key)
+
+        if not arrays:
+            self.misses += 1
+            return 0
+
+        self.hits += 1
+
+        for line, larray in zip(indicator.lines, arrays):
+            line.array = larray[:]
+
+        return len(arrays[0])
+
+    def _save(self, key, indicator):
+        arrays = tuple(line.array[:] for line in indicator.lines)
+        if self.cachedir is not None:
+            self._disksave(key, arrays)
+
+        arrsize = self._arrsize(arrays)
+        if arrsize > self.maxsize:
+            return  # would evict everything and not fit either
+
+        old = self._store.pop(key, None)
+        if old is not None:
+            self.size -= self._arrsize(old)
+
+        self._store[key] = arrays
+        self.size += arrsize
+
+        while self.size > self.maxsize:
+            _, old = self._store.popitem(last=False)
+            self.size -= self._arrsize(old)
+
+    def _diskpath(self, keystr):
+        fname = hashlib.sha1(keystr.encode('utf-8')).hexdigest() + '.btc'
+        return os.path.join(self.cachedir, fname)
+
+    def _diskload(self, key):
+        keystr = _keystr(key)
+        try:
+            f = open(self._diskpath(keystr), 'rb')
+        except (IOError, OSError):
+            return None
+
+        try:
+            header = json.loads(f.readline().decode('utf-8'))
+            if header['key'] != keystr:
+                return None
+
+            feeds = _keyfeeds(key)
+            if len(feeds) != len(header['feeds']):
+                return None
+
+            for feed, fp in zip(feeds, header['feeds']):
+                if not DataFingerprint.matches(feed, fp):
+                    return None
+
+            arrays = list()
+            for typecode, length in header['lines']:
+                larray = array.array(str(typecode))
+                larray.fromfile(f, length)
+                arrays.append(larray)
+
+        except (ValueError, KeyError, EOFError):
+            return None  # corrupt/old format ... ignore it
+
+        finally:
+            f.close()
+
+        return tuple(arrays)
+
+    def _disksave(self, key, arrays):
+        keystr = _keystr(key)
+        header = dict(
+            key=keystr,
+            feeds=[DataFingerprint.create(f) for f in _keyfeeds(key)],
+            lines=[(a.typecode, len(a)) for a in arrays])
+
+        path = self._diskpath(keystr)
+        tmppath = path + '.tmp'
+        with open(tmppath, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            for larray in arrays:
+                larray.tofile(f)
+
+        if os.path.exists(path):
+            os.remove(path)
+
+        os.rename(tmppath, path)
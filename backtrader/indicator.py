@@ -25,6 +25,7 @@ from __future__ import (absolute_import, division, print_function,
 import six
 from six.moves import xrange
 
+from .indcache import cachekey, iscomposite
 from .lineiterator import LineIterator, IndicatorBase
 from .lineseries import LineSeriesMaker
 
@@ -44,6 +45,8 @@ class MetaIndicator(IndicatorBase.__class__):
             cls._indcol[name] = cls
 
     def donew(cls, *args, **kwargs):
+        # lazy: calculated in "once" mode only if the values are read
+        lazy = kwargs.pop('lazy', False)
 
         if IndicatorBase.next == cls.next:
             # if next has not been overriden, there is no need for a
@@ -62,6 +65,12 @@ class MetaIndicator(IndicatorBase.__class__):
 
         _obj, args, kwargs = super(MetaIndicator, cls).donew(*args, **kwargs)
 
+        # Inherit the (optimization) results cache from the owner
+        _obj._indcache = getattr(_obj._owner, '_indcache', None)
+        # The arguments for __init__ (not datas/params) are part of the key
+        _obj._initargs = (tuple(args), dict(kwargs))
+        _obj._lazy = lazy
+
         # If only 1 data was passed and it's multiline, put the 2nd
         # and later lines in the datas array. This allows things like
         # passing a "Stochastic" to a crossover indicator and it will
@@ -86,6 +95,65 @@ class MetaIndicator(IndicatorBase.__class__):
 class Indicator(six.with_metaclass(MetaIndicator, IndicatorBase)):
     _autoinit = True
     _ltype = LineIterator.IndType
+    _indcache = None
+    _cacheable = None  # see indcache._cacheable
+    _lazy = False
+
+    def _once(self):
+        cache = self._indcache
+        if cache is None:
+            super(Indicator, self)._once()
+            return
+
+        key = cachekey(self)
+        restored = cache.load(key, self) if key is not None else 0
+        if restored:
+            if restored == self._clock.buflen():
+                # values restored - the sub-indicators need no calculation
+                for line in self.lines:
+                    line.oncebinding()
+                return
+
+            if self._minperiod <= restored < self._clock.buflen() and \
+               type(self).once != Indicator.once:
+                # bars appended to the datas: calculate only the new ones
+                self._oncefrom(restored)
+                cache.save(key, self)
+                return
+
+            # the generic once moves the data pointers along: start anew
+            self.lines.reset()
+
+        super(Indicator, self)._once()
+
+        if key is not None:
+            cache.save(key, self)
+
+    def _oncefrom(self, start):
+        # The lines hold already the values for the bars before start
+        self.forward(size=self._clock.buflen() - start)
+
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            if not indicator._onceskip:
+                indicator._once()
+
+        for data in self.datas:
+            data.home()
+
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            indicator.home()
+
+        self.home()
+        self._onceunshare()
+
+        self.once(start, self.buflen())
+
+        for line in self.lines:
+            line.oncebinding()
+
+    def _oncewrites(self):
+        # composites only calculate through sub-indicators and bindings
+        return not iscomposite(self)
 
     def advance(self):
         # Need intercepting this call to support datas with
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import collections
+import os.path
+import struct
+
+
+class OrderJournal(object):
+    '''
+    Streams the executions and the final status of orders to a binary file
+    during a run.
+
+    The file is made up of fixed size little endian records:
+
+      - kind, status, ordtype, exectype: unsigned bytes
+      - data: index of the data (unsigned short)
+      - ref: reference of the order (long long)
+      - dt, size, price, value, comm, psize, pprice: doubles
+
+    A ``Name`` record maps a data index to its name (in place of the doubles)
+    before the first record of the data. An ``Execution`` record is written
+    for each execution bit and a ``Status`` record when an order is done
+    (Completed, Canceled, Expired, Margin) with the accumulated execution
+    values.
+
+    Each optimization combination gets its own file: the first one is
+    written to ``path`` and the following ones to ``path`` with the number of
+    the combination inserted before the extension (``orders.1.btj``,
+    ``orders.2.btj``, ...)
+
+    Use ``read`` to load a journal as columns
+    '''
+    Name, Execution, Status = range(3)
+
+    magic = b'BTJ1'
+    record = struct.Struct(str('<BBBBHq7d'))
+    namerecord = struct.Struct(str('<BBBBHq56s'))
+
+    columns = ('kind', 'status', 'ordtype', 'exectype', 'data', 'ref',
+               'dt', 'size', 'price', 'value', 'comm', 'psize', 'pprice')
+
+    def __init__(self, path):
+        self.path = path
+        self.f = None
+        self.datas = dict()  # data -> index
+        self.exbits = dict()  # ref -> number of exbits already written
+
+    @staticmethod
+    def combpath(path, combination=0):
+        '''Returns the path of the journal of the given combination'''
+        if not combination:
+            return path
+
+        root, ext = os.path.splitext(path)
+        return '%s.%d%s' % (root, combination, ext)
+
+    def start(self, combination=0):
+        self.path = self.combpath(self.path, combination)
+        self.f = open(self.path, 'wb')
+        self.f.write(self.magic)
+        self.datas = dict()
+        self.exbits = dict()
+
+    def stop(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+    def _dataidx(self, data):
+        didx = self.datas.get(data)
+        if didx is None:
+            didx = self.datas[data] = len(self.datas)
+            name = (data._name or '').encode('utf-8')[:56]
+            self.f.write(self.namerecord.pack(self.Name, 0, 0, 0, didx, 0,
+                                              name))
+
+        return didx
+
+    def notify(self, order):
+        '''Writes the new execution bits and the final status of order'''
+        if self.f is None:
+            self.f = open(self.path, 'ab')  # carrying on after stop
+
+        didx = self._dataidx(order.data)
+        head = (order.status, order.ordtype, order.exectype, didx, order.ref)
+
+        exbits = order.executed.exbits
+        for exbit in exbits[self.exbits.get(order.ref, 0):]:
+            self.f.write(self.record.pack(
+                self.Execution, *(head + (
+                    exbit.dt, exbit.size, exbit.price, exbit.value,
+                    exbit.comm, exbit.psize, exbit.pprice))))
+
+        if order.alive():
+            self.exbits[order.ref] = len(exbits)
+            return
+
+        self.exbits.pop(order.ref, None)
+        executed = order.executed
+        self.f.write(self.record.pack(
+            self.Status, *(head + (
+                executed.dt or 0.0, executed.size, executed.price,
+                executed.value, executed.comm,
+                executed.psize, executed.pprice))))
+
+    @classmethod
+    def read(cls, path):
+        '''
+        Returns an OrderedDict with the columns of the Execution and Status
+        records of the journal in path. The data column holds the names of the
+        datas and the floating point columns are arrays of doubles
+        '''
+        cols = collections.OrderedDict()
+        for name in cls.columns:
+            cols[name] = array.array(str('d')) \
+                if name in cls.columns[6:] else list()
+
+        names = dict()
+        with open(path, 'rb') as f:
+            if f.read(len(cls.magic)) != cls.magic:
+                raise ValueError('%s is not an order journal' % path)
+
+            recsize = cls.record.size
+            while True:
+                rec = f.read(recsize)
+                if len(rec) < recsize:
+                    break
+
+                if rec[0:1] == b'\x00':  # Name
+                    fields = cls.namerecord.unpack(rec)
+                    names[fields[4]] = \
+                        fields[6].rstrip(b'\x00').decode('utf-8')
+                    continue
+
+                fields = cls.record.unpack(rec)
+                for name, value in zip(cls.columns, fields):
+                    cols[name].append(value)
+
+        cols['data'] = [names[didx] for didx in cols['data']]
+        return cols
@@ -32,6 +32,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import array
+import collections
 
 import six
 from six.moves import xrange
@@ -44,6 +45,49 @@ from .utils import num2date
 NAN = float('NaN')
 
 
+class BufferPool(object):
+    '''
+    Keeps the arrays of released lines by typecode and length.
+
+    A line which is moved forward in one go over an empty buffer (the "once"
+    calculation of indicators and observers) takes an array of the same
+    length from the pool and refills it in place instead of growing a new one.
+
+    The arrays of NaN (the default value of the lines) used to fill the lines
+    are kept too: the lines of a run share the same length
+    '''
+    def __init__(self):
+        self._arrays = collections.defaultdict(list)
+        self._fills = dict()  # (typecode, size) -> array of NaN
+
+    def put(self, larray):
+        if isinstance(larray, array.array) and len(larray):
+            self._arrays[(larray.typecode, len(larray))].append(larray)
+
+    def get(self, typecode, size, value=NAN):
+        try:
+            larray = self._arrays[(str(typecode), size)].pop()
+        except IndexError:
+            return None
+
+        # same length: copied over the existing storage
+        larray[:] = self.fill(typecode, value, size)
+        return larray
+
+    def fill(self, typecode, value, size):
+        '''Returns an array of ``size`` elements set to ``value``'''
+        typecode = str(typecode)
+        if value != value:
+            fill = self._fills.get((typecode, size))
+            if fill is None:
+                fill = self._fills[(typecode, size)] = \
+                    array.array(typecode, [value]) * size
+
+            return fill
+
+        return array.array(typecode, [value]) * size
+
+
 class LineBuffer(LineSingle):
     '''
     LineBuffer defines an interface to an "array.array" (or list) in which
@@ -78,9 +122,17 @@ class LineBuffer(LineSingle):
         self.bindings = list()
         self.reset()
 
+    bufpool = None  # BufferPool recycling the array (see setbufpool)
+    _shared = False  # the array is shared with bound lines (oncebinding)
+
     def reset(self):
         ''' Resets the internal buffer structure and the indices
         '''
+        if self._shared:
+            self._shared = False  # other lines still hold the array
+        elif self.bufpool is not None:
+            self.bufpool.put(getattr(self, 'array', None))
+
         self.create_array()
         self.idx = -1
         self.extension = 0
@@ -88,6 +140,28 @@ class LineBuffer(LineSingle):
     def create_array(self):
         self.array = array.array(str(self.typecode))
 
+    def fillarray(self, value, size):
+        ''' Returns an array of ``size`` elements set to ``value``
+        '''
+        if self.bufpool is not None:
+            return self.bufpool.fill(self.typecode, value, size)
+
+        return array.array(str(self.typecode), [value]) * size
+
+    def setbufpool(self, pool):
+        ''' Sets the BufferPool which recycles the array of the line (None to
+        stop recycling)
+        '''
+        self.bufpool = pool
+
+    def unshare(self):
+        ''' Takes a private copy of the array if it is shared with bound lines
+        (copy-on-write)
+        '''
+        if self._shared:
+            self.array = self.array[:]
+            self._shared = False
+
     def __len__(self):
         return self.idx + 1
 
@@ -140,6 +214,9 @@ class LineBuffer(LineSingle):
             the slice
             value (variable): value to be set
         '''
+        if self._shared:
+            self.unshare()
+
         self.array[self.idx + ago] = value
         for binding in self.bindings:
             binding[ago] = value
@@ -152,6 +229,9 @@ class LineBuffer(LineSingle):
             ago (int): Point of the array to which size will be added to return
             the slice
         '''
+        if self._shared:
+            self.unshare()
+
         self.array[self.idx + ago] = value
         for binding in self.bindings:
             binding[ago] = value
@@ -164,6 +244,11 @@ class LineBuffer(LineSingle):
         '''
         self.idx = -1
 
+    def seekend(self):
+        ''' Moves the logical index to the last value held in the buffer
+        '''
+        self.idx = self.buflen() - 1
+
     def forward(self, value=NAN, size=1):
         ''' Moves the logical index foward and enlarges the buffer as much as needed
 
@@ -171,9 +256,23 @@ class LineBuffer(LineSingle):
             value (variable): value to be set in new positins
             size (int): How many extra positions to enlarge the buffer
         '''
+        if self._shared:
+            self.unshare()
+
         self.idx += size
-        for i in range(size):
+        if size == 1:
             self.array.append(value)
+            return
+
+        if self.bufpool is not None and not self.array:
+            larray = self.bufpool.get(self.typecode, size, value)
+            if larray is not None:
+                self.array = larray
+                return
+
+        if size > 0:
+            # a single resize: exact when the buffer is empty
+            self.array.extend(self.fillarray(value, size))
 
     def backwards(self, size=1):
         ''' Moves the logical index backwards and reduces the buffer as much as needed
@@ -183,9 +282,13 @@ class LineBuffer(LineSingle):
             buffer
 
         '''
+        if self._shared:
+            self.unshare()
+
         self.idx -= size
-        for i in range(size):
-            self.array.pop()
+        if size > 0:
+            # truncated in one go, not element by element
+            del self.array[-size:]
 
     def rewind(self, size=1):
         self.idx -= size
@@ -208,9 +311,12 @@ class LineBuffer(LineSingle):
         The purpose is to allow for lookahead operations or to be able to
         set values in the buffer "future"
         '''
+        if self._shared:
+            self.unshare()
+
         self.extension += size
-        for i in range(size):
-            self.array.append(value)
+        if size > 0:
+            self.array.extend(self.fillarray(value, size))
 
     def addbinding(self, binding):
         ''' Adds another line binding
@@ -246,11 +352,26 @@ class LineBuffer(LineSingle):
     def oncebinding(self):
         '''
         Executes the bindings when running in "once" mode
+
+        A binding with the same buffer layout shares the array instead of
+        getting a copy of it. The lines sharing an array take a private copy
+        of it when they are written again (see ``unshare``) and before the
+        "once" calculation of an owner which may write straight into the
+        array
         '''
         larray = self.array
         blen = self.buflen()
         for binding in self.bindings:
-            binding.array[0:blen] = larray[0:blen]
+            barray = binding.array
+            if (isinstance(larray, array.array) and
+                    isinstance(barray, array.array) and
+                    len(barray) == len(larray) and
+                    binding.extension == self.extension and
+                    barray.typecode == larray.typecode):
+                binding.array = larray
+                binding._shared = self._shared = True
+            else:
+                barray[0:blen] = larray[0:blen]
 
     def bind2lines(self, binding=0):
         '''
@@ -345,6 +466,7 @@ class LineActions(six.with_metaclass(MetaLineActions, LineBuffer)):
     '''
 
     _ltype = LineBuffer.IndType
+    _onceskip = False
 
     @staticmethod
     def arrayize(obj):
@@ -369,6 +491,16 @@ class LineActions(six.with_metaclass(MetaLineActions, LineBuffer)):
         else:
             self.prenext()
 
+    def _resume(self):
+        self.seekend()
+
+    def _release(self, released):
+        released.add(id(self))
+        self.reset()
+
+    def _setbufpool(self, pool):
+        self.setbufpool(pool)
+
     def _once(self):
         self.forward(size=self._owner.buflen())
         self.home()
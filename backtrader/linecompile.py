@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+
+.. module:: linecompile
+
+Compilation of the "next" mode calculation of the indicators of a strategy
+into a single generated function.
+
+The generated function carries out, for every bar, exactly the steps of
+``LineIterator._next`` and ``LineActions._next`` for the whole tree of
+indicators (and line operations) in the same order, but without the
+recursion: the methods are bound and the minimum periods resolved when the
+function is generated, the lengths are read from the buffers and the no-op
+``prenext``/``_notify`` calls are left out.
+
+Nodes overriding ``_next`` are called as they are
+
+.. moduleauthor:: Daniel Rodriguez
+
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import six
+
+from .linebuffer import LineBuffer, LineActions
+from .lineroot import LineRoot
+from .lineseries import Lines, LineSeries
+from .lineiterator import LineIterator
+
+
+_codecache = dict()  # source -> code of the generated functions
+
+
+def _func(cls, name):
+    return six.get_unbound_function(getattr(cls, name))
+
+
+_noops = (_func(LineRoot, 'prenext'), _func(LineIterator, 'prenext'),
+          _func(LineIterator, '_notify'))
+_nextstarts = (_func(LineRoot, 'nextstart'), _func(LineIterator, 'nextstart'))
+
+
+def _method(node, name):
+    '''Returns the function behind a method of node or None if the method
+    has been set in the instance'''
+    if name in vars(node):
+        return None
+
+    return _func(type(node), name)
+
+
+class NextCompiler(object):
+    '''
+    Generates the function which calculates in "next" mode the indicators of
+    an owner (usually a strategy)
+    '''
+    def __init__(self, owner):
+        self.names = dict()
+        self.ids = dict()  # id(obj) -> name
+        self.lines = list()
+        self.nlens = 0  # local variables holding the length of the clocks
+        self._steps(owner, 1)
+
+    def _name(self, prefix, obj):
+        name = self.ids.get(id(obj))
+        if name is None:
+            name = self.ids[id(obj)] = '%s%d' % (prefix, len(self.names))
+            self.names[name] = obj
+
+        return name
+
+    def _len(self, obj):
+        '''Expression with the length of obj'''
+        if isinstance(obj, LineSeries) and \
+           _func(type(obj), '__len__') is _func(LineSeries, '__len__') and \
+           _func(type(obj.lines), '__len__') is _func(Lines, '__len__'):
+            obj = obj.lines[0]
+
+        if isinstance(obj, LineBuffer) and \
+           _func(type(obj), '__len__') is _func(LineBuffer, '__len__'):
+            return '(%s.idx + 1)' % self._name('b', obj)
+
+        return 'len(%s)' % self._name('o', obj)
+
+    def _add(self, indent, line):
+        self.lines.append('    ' * indent + line)
+
+    def _phases(self, node, clen, minperiod, indent):
+        nxt = self._name('m', node.next)
+        if _method(node, 'nextstart') in _nextstarts:
+            nxtstart = nxt
+        else:
+            nxtstart = self._name('m', node.nextstart)
+
+        if nxtstart == nxt:
+            self._add(indent, 'if %s >= %d:' % (clen, minperiod))
+            self._add(indent + 1, '%s()' % nxt)
+        else:
+            self._add(indent, 'if %s > %d:' % (clen, minperiod))
+            self._add(indent + 1, '%s()' % nxt)
+            self._add(indent, 'elif %s == %d:' % (clen, minperiod))
+            self._add(indent + 1, '%s()' % nxtstart)
+
+        if _method(node, 'prenext') not in _noops:
+            self._add(indent, 'else:')
+            self._add(indent + 1, '%s()' % self._name('m', node.prenext))
+
+    def _steps(self, owner, indent):
+        for node in owner._lineiterators[LineIterator.IndType]:
+            self._node(node, indent)
+
+    def _node(self, node, indent):
+        clen = 'c%d' % self.nlens
+        self.nlens += 1
+
+        if isinstance(node, LineActions) and \
+           _method(node, '_next') is _func(LineActions, '_next'):
+            self._add(indent, '%s = %s' % (clen, self._len(node._owner)))
+            self._add(indent, 'if %s > %s:' % (clen, self._len(node)))
+            self._add(indent + 1, '%s()' % self._name('m', node.forward))
+            self._phases(node, clen, node._minperiod, indent)
+
+        elif isinstance(node, LineIterator) and \
+                node._ltype != LineIterator.StratType and \
+                _method(node, '_next') is _func(LineIterator, '_next'):
+            self._add(indent, '%s = %s' % (clen, self._len(node._clock)))
+            self._add(indent, 'if %s != %s:' % (clen, self._len(node)))
+            self._add(indent + 1, '%s()' % self._name('m', node.forward))
+            self._steps(node, indent)
+            if _method(node, '_notify') not in _noops:
+                self._add(indent, '%s()' % self._name('m', node._notify))
+
+            self._phases(node, clen, node._minperiod, indent)
+            for observer in node._lineiterators[LineIterator.ObsType]:
+                self._add(indent, '%s()' % self._name('m', observer._next))
+
+        else:
+            self._add(indent, '%s()' % self._name('m', node._next))
+
+    def compile(self):
+        src = '\n'.join(['def nextind():'] + (self.lines or ['    pass']))
+        src += '\n'
+        code = _codecache.get(src)
+        if code is None:
+            code = _codecache[src] = compile(src, '<linecompile>', 'exec')
+
+        names = dict(self.names)
+        six.exec_(code, names)
+        return names['nextind']
+
+
+def compilenext(owner):
+    '''
+    Returns a function which calculates the indicators of owner for a bar in
+    "next" mode
+    '''
+    return NextCompiler(owner).compile()
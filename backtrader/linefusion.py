@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+
+.. module:: linefusion
+
+Fusion of chains of element-wise line operations (``LinesOperation`` and
+``LineOwnOperation``) into a single kernel.
+
+An operation whose only consumer is another operation of the same owner does
+not need a buffer of its own: it is inlined in the expression of the
+consumer. The last operation of a chain (the root) is the only one which is
+materialized and calculates the whole expression per bar ("next" mode) or per
+slice ("once" mode). The inlined operations are removed from their owner and
+never calculated.
+
+An operation is only inlined if it is not reachable but from its owner and
+its consumer: operations kept in attributes of the strategy, its indicators
+and observers (and therefore possibly read by their logic), read by other
+lines or indicators or bound to lines remain in place
+
+.. moduleauthor:: Daniel Rodriguez
+
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import six
+from six.moves import xrange
+
+from .linebuffer import LineBuffer, LinesOperation, LineOwnOperation
+from .lineiterator import LineIterator
+
+
+_codecache = dict()  # source -> code of the generated kernels
+
+
+def _isop(obj):
+    return type(obj) in (LinesOperation, LineOwnOperation)
+
+
+def _operands(op):
+    if type(op) is LineOwnOperation:
+        return [op.a]
+
+    return [op.a, op.b]
+
+
+def _refs(obj):
+    '''
+    Returns the ids of the objects held in the attributes of obj and in the
+    lists, tuples and dictionaries kept in them
+    '''
+    ids = set()
+    for name, value in vars(obj).items():
+        if name == '_lineiterators':
+            continue  # the owned nodes
+
+        ids.add(id(value))
+        if isinstance(value, (list, tuple)):
+            ids.update(id(x) for x in value)
+        elif isinstance(value, dict):
+            ids.update(id(x) for x in value.values())
+
+    return ids
+
+
+def _owners(owner):
+    owners = [owner]
+    for ltype in (LineIterator.IndType, LineIterator.ObsType):
+        for node in owner._lineiterators[ltype]:
+            if isinstance(node, LineIterator):
+                owners.extend(_owners(node))
+
+    return owners
+
+
+class Kernel(object):
+    '''
+    Generates the ``next`` and ``once`` of a root operation which evaluate
+    the expression of the root and the operations inlined in it
+    '''
+    def __init__(self, root, inlined):
+        self.inlined = inlined
+        self.names = dict(root=root, xrange=xrange)
+        self.ids = dict()  # id(line/constant) -> name
+        self.leaves = list()  # (name, line) read by the expression
+        self.nextexpr = self._expr(root, '%s[0]')
+        self.onceexpr = self._expr(root, 'a%s[i]')
+
+    def _name(self, prefix, obj):
+        name = self.ids.get(id(obj))
+        if name is None:
+            name = self.ids[id(obj)] = '%s%d' % (prefix, len(self.names))
+            self.names[name] = obj
+            if prefix == 'l':
+                self.leaves.append((name, obj))
+
+        return name
+
+    def _expr(self, op, leaffmt):
+        args = list()
+        for operand in _operands(op):
+            if id(operand) in self.inlined:
+                args.append(self._expr(operand, leaffmt))
+            elif isinstance(operand, LineBuffer):
+                args.append(leaffmt % self._name('l', operand))
+            else:
+                args.append(self._name('c', operand))
+
+        return '%s(%s)' % (self._name('f', op.operation), ', '.join(args))
+
+    def _compile(self, src, fname):
+        code = _codecache.get(src)
+        if code is None:
+            code = _codecache[src] = compile(src, '<linefusion>', 'exec')
+
+        names = dict(self.names)
+        six.exec_(code, names)
+        return names[fname]
+
+    def next(self):
+        src = 'def next():\n'
+        src += '    root[0] = %s\n' % self.nextexpr
+        return self._compile(src, 'next')
+
+    def once(self):
+        src = 'def once(start, end):\n'
+        src += '    dst = root.array\n'
+        for name, line in self.leaves:
+            src += '    a%s = %s.array\n' % (name, name)
+
+        src += '    for i in xrange(start, end):\n'
+        src += '        dst[i] = %s\n' % self.onceexpr
+        return self._compile(src, 'once')
+
+
+def fuse(strategy):
+    '''
+    Fuses the chains of line operations of the strategy and its indicators.
+    Returns the number of inlined operations
+    '''
+    owners = _owners(strategy)
+
+    # owner of the consumers of each operation and the objects reachable
+    # otherwise. Only ids are kept: lines overload the comparisons
+    consumers = dict()
+    pinned = set()
+    for owner in owners:
+        pinned.update(_refs(owner))
+        for ltype in (LineIterator.IndType, LineIterator.ObsType):
+            for node in owner._lineiterators[ltype]:
+                if not _isop(node):
+                    if not isinstance(node, LineIterator):
+                        pinned.update(_refs(node))  # other line actions
+                    continue
+
+                for operand in _operands(node):
+                    if _isop(operand):
+                        consumers.setdefault(id(operand), list()).append(
+                            id(node._owner))
+
+    inlined = dict()
+    for owner in owners:
+        for node in owner._lineiterators[LineIterator.IndType]:
+            cons = consumers.get(id(node))
+            if not _isop(node) or not cons or len(cons) > 1:
+                continue
+
+            # a single consumer of the same owner and nothing else
+            if cons[0] == id(owner) and not node.bindings and \
+                    id(node) not in pinned:
+                inlined[id(node)] = node
+
+    if not inlined:
+        return 0
+
+    for owner in owners:
+        nodes = owner._lineiterators[LineIterator.IndType]
+        for node in nodes:
+            if id(node) in inlined or not _isop(node):
+                continue
+
+            if any(id(x) in inlined for x in _operands(node)):
+                kernel = Kernel(node, inlined)
+                node.next = kernel.next()
+                node.once = kernel.once()
+                # the lines the expression reads (see LineGraph)
+                node.fused = [line for name, line in kernel.leaves]
+
+        owner._lineiterators[LineIterator.IndType] = \
+            [node for node in nodes if id(node) not in inlined]
+
+    return len(inlined)
@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+
+.. module:: linegraph
+
+Dependency graph of the indicators (and line operations) of a strategy, used
+in "once" mode to skip the calculation of indicators whose values are not
+needed by the strategy logic or the observers.
+
+Skipped indicators get their buffers replaced by a placeholder which
+calculates the indicator the first time the values are read (for example
+during plotting)
+
+.. moduleauthor:: Daniel Rodriguez
+
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+
+from .indcache import iscomposite
+from .linebuffer import LineBuffer, LineActions
+from .lineroot import LineRoot
+from .lineseries import LineSeriesStub
+from .lineiterator import LineIterator
+
+
+class LazyArray(object):
+    '''
+    Placeholder for the buffer of a line whose indicator has not been
+    calculated. Any access calculates the indicator and is then delegated to
+    the real buffer
+    '''
+    def __init__(self, graph, node, line):
+        self._graph = graph
+        self._node = node
+        self._line = line
+
+    def _array(self):
+        self._graph.calc(self._node)
+        return self._line.array
+
+    def __len__(self):
+        return len(self._array())
+
+    def __iter__(self):
+        return iter(self._array())
+
+    def __getitem__(self, key):
+        return self._array()[key]
+
+    def __setitem__(self, key, value):
+        self._array()[key] = value
+
+    def __getattr__(self, name):
+        return getattr(self._array(), name)
+
+
+class LineGraph(object):
+    '''
+    Nodes are the indicators and line operations registered (directly or
+    indirectly) with a strategy. A node depends on:
+
+      - Line operations: the lines they operate on
+
+      - Indicators with own calculation logic: the datas, the
+        sub-indicators and any line passed as parameter
+
+      - Indicators which only bind the lines of sub-indicators (composition):
+        only the sub-indicators whose lines are bound
+
+    The roots are the observers and the indicators created directly by the
+    strategy, unless created with ``lazy=True`` or ``plotonly=True``. Anything
+    not reachable from the roots is skipped.
+    '''
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        # keyed by id: lines objects overload the comparison operators
+        self.nodes = collections.OrderedDict()
+        self.parents = dict()
+        self._collect(strategy)
+
+        nodes = list(self.nodes.values())
+        self.deps = dict((id(node), list()) for node in nodes)
+        for node in nodes:
+            for dep in self._nodedeps(node):
+                self.deps[id(node)].append(dep)
+
+            # a binding makes the target depend on the source
+            for line in self._lines(node):
+                for binding in line.bindings:
+                    target = self.nodeof(binding)
+                    if target is not None:
+                        self.deps[id(target)].append(node)
+
+        # all lines whose pointers may be moved by a calculation
+        lines = collections.OrderedDict()
+        for node in nodes:
+            for line in self._lines(node):
+                lines[id(line)] = line
+
+            for data in getattr(node, 'datas', []):
+                for line in data.lines:
+                    lines[id(line)] = line
+
+        for data in strategy.datas:
+            for line in data.lines:
+                lines[id(line)] = line
+
+        self.lines = list(lines.values())
+
+    def _collect(self, owner):
+        for ltype in (LineIterator.IndType, LineIterator.ObsType):
+            for node in owner._lineiterators[ltype]:
+                self.nodes[id(node)] = node
+                self.parents[id(node)] = owner
+                if isinstance(node, LineIterator):
+                    self._collect(node)
+
+    @staticmethod
+    def _lines(node):
+        if isinstance(node, LineActions):
+            return [node]
+
+        return list(node.lines)
+
+    @staticmethod
+    def _children(node):
+        if isinstance(node, LineActions):
+            return []
+
+        return (node._lineiterators[LineIterator.IndType] +
+                node._lineiterators[LineIterator.ObsType])
+
+    @staticmethod
+    def _islazy(node):
+        if getattr(node, '_lazy', False):
+            return True
+
+        plotinfo = getattr(node, 'plotinfo', None)
+        return plotinfo is not None and plotinfo._get('plotonly', False)
+
+    def nodeof(self, obj):
+        '''Returns the node producing the values of obj (None for datas)'''
+        if isinstance(obj, LineSeriesStub):
+            obj = obj.lines[0]
+
+        if not isinstance(obj, (LineActions, LineIterator)) and \
+           isinstance(obj, LineBuffer):
+            obj = obj._owner
+
+        return self.nodes.get(id(obj), None)
+
+    def _nodedeps(self, node):
+        if isinstance(node, LineActions):
+            values = [v for k, v in vars(node).items()
+                      if not k.startswith('_')]
+        elif iscomposite(node):
+            return []
+        else:
+            values = node.datas + self._children(node)
+            values += list(node.params._getvalues())
+
+        deps = list()
+        while values:
+            value = values.pop()
+            if isinstance(value, (list, tuple)):
+                values.extend(value)  # like the args of Max/Min
+            elif isinstance(value, LineRoot):
+                dep = self.nodeof(value)
+                if dep is not None:
+                    deps.append(dep)
+
+        return deps
+
+    def _reach(self, nodes, within=None):
+        '''Closure of nodes over dependencies and owners'''
+        reached = set()
+        pending = list(nodes)
+        while pending:
+            node = pending.pop()
+            if id(node) in reached:
+                continue
+            if within is not None and id(node) not in within:
+                continue
+
+            reached.add(id(node))
+            pending.extend(self.deps[id(node)])
+
+            parent = self.parents[id(node)]
+            if id(parent) in self.nodes:
+                pending.append(parent)
+
+        return reached
+
+    def _subtree(self, node):
+        subtree = [node]
+        for child in self._children(node):
+            subtree.extend(self._subtree(child))
+
+        return subtree
+
+    def prune(self):
+        '''
+        Marks the nodes which are not needed to be skipped in "once" mode.
+        Returns the number of skipped nodes
+        '''
+        strategy = self.strategy
+        roots = [node for node in strategy._lineiterators[LineIterator.IndType]
+                 if not self._islazy(node)]
+        roots += strategy._lineiterators[LineIterator.ObsType]
+
+        needed = self._reach(roots)
+
+        skipped = 0
+        for node in self.nodes.values():
+            if id(node) not in needed:
+                node._onceskip = True
+                for line in self._lines(node):
+                    line.array = LazyArray(self, node, line)
+
+                skipped += 1
+
+        return skipped
+
+    def levels(self):
+        '''
+        Groups the not skipped indicators of the strategy in levels. The
+        indicators of a level depend only on indicators of previous levels
+        '''
+        tops = [node for node in self.strategy._lineiterators[
+            LineIterator.IndType] if not node._onceskip]
+
+        topof = dict()
+        for top in tops:
+            for node in self._subtree(top):
+                topof[id(node)] = top
+
+        toplevels = dict()
+        for top in tops:  # dependencies are created before the dependants
+            level = 0
+            for node in self._subtree(top):
+                for dep in self.deps[id(node)]:
+                    deptop = topof.get(id(dep), top)
+                    if deptop is not top:
+                        level = max(level, toplevels.get(id(deptop), 0) + 1)
+
+            toplevels[id(top)] = level
+
+        levels = list()
+        for top in tops:
+            level = toplevels[id(top)]
+            while len(levels) <= level:
+                levels.append(list())
+
+            levels[level].append(top)
+
+        return levels
+
+    def threadsafe(self, node):
+        '''
+        Returns True if calculating node in "once" mode does not move the
+        pointers of the datas, which the generic once of Indicator does
+        '''
+        # Imported here to avoid a circular import
+        from .indicator import Indicator
+
+        for other in self._subtree(node):
+            if other._onceskip or not isinstance(other, Indicator):
+                continue
+
+            if type(other).once == Indicator.once or \
+               type(other).preonce == Indicator.preonce:
+                return False
+
+        return True
+
+    def calc(self, node):
+        '''Calculates a skipped node (and what it needs) in "once" mode'''
+        # the clock may also have been skipped and determines the length
+        clock = node._owner if isinstance(node, LineActions) else node._clock
+        clock.buflen()
+
+        if not node._onceskip:
+            return  # calculated as part of the clock
+
+        subtree = self._subtree(node)
+        needed = self._reach([node], within=set(map(id, subtree)))
+        for other in subtree:
+            if id(other) in needed:
+                other._onceskip = False
+
+        # the buffers of anything _once will visit are created anew
+        visit = [node]
+        while visit:
+            other = visit.pop()
+            for line in self._lines(other):
+                idx = line.idx
+                line.reset()
+                line.idx = idx
+
+            visit.extend(child for child in self._children(other)
+                         if not child._onceskip)
+
+        idxs = [line.idx for line in self.lines]
+        node._once()
+        for line, idx in zip(self.lines, idxs):
+            line.idx = idx
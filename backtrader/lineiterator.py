@@ -138,7 +138,10 @@ class LineIterator(six.with_metaclass(MetaLineIterator, LineSeries)):
                     plotyhlines=[],
                     plotyticks=[],
                     plothlines=[],
-                    plotforce=False,)
+                    plotforce=False,
+                    plotonly=False,)
+
+    _onceskip = False
 
     def _stage2(self):
         super(LineIterator, self)._stage2()
@@ -201,8 +204,7 @@ class LineIterator(six.with_metaclass(MetaLineIterator, LineSeries)):
         if clock_len != len(self):
             self.forward()
 
-        for indicator in self._lineiterators[LineIterator.IndType]:
-            indicator._next()
+        self._nextindicators()
 
         self._notify()
 
@@ -229,11 +231,51 @@ class LineIterator(six.with_metaclass(MetaLineIterator, LineSeries)):
         for observer in self._lineiterators[LineIterator.ObsType]:
             observer._next()
 
+    def _nextindicators(self):
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            indicator._next()
+
+    def _resume(self):
+        # "once" mode leaves the pointers of sub-indicators at the start
+        # of the buffers. Move everything to the last calculated value to
+        # carry on in "next" mode
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            indicator._resume()
+
+        for observer in self._lineiterators[LineIterator.ObsType]:
+            observer._resume()
+
+        for line in self.lines:
+            line.seekend()
+
+    def _release(self, released):
+        # Drop the buffers of the lines of the sub-indicators, observers and
+        # own lines once the values are no longer needed. The ids of the
+        # lines are added to released
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            indicator._release(released)
+
+        for observer in self._lineiterators[LineIterator.ObsType]:
+            observer._release(released)
+
+        released.update(id(line) for line in self.lines)
+        self.reset()
+
+    def _setbufpool(self, pool):
+        # The arrays of the lines of the sub-indicators, observers and own
+        # lines are recycled by pool
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            indicator._setbufpool(pool)
+
+        for observer in self._lineiterators[LineIterator.ObsType]:
+            observer._setbufpool(pool)
+
+        self.lines.setbufpool(pool)
+
     def _once(self):
         self.forward(size=self._clock.buflen())
 
-        for indicator in self._lineiterators[LineIterator.IndType]:
-            indicator._once()
+        self._onceindicators()
 
         for observer in self._lineiterators[LineIterator.ObsType]:
             observer.forward(size=self.buflen())
@@ -248,6 +290,7 @@ class LineIterator(six.with_metaclass(MetaLineIterator, LineSeries)):
             observer.home()
 
         self.home()
+        self._onceunshare()
 
         # These 3 remain empty for a strategy and therefore play no role
         # because a strategy will always be executed on a next basis
@@ -259,6 +302,23 @@ class LineIterator(six.with_metaclass(MetaLineIterator, LineSeries)):
         for line in self.lines:
             line.oncebinding()
 
+    def _onceunshare(self):
+        # A line sharing the array of a bound line (see oncebinding) takes a
+        # private copy before a calculation which may write straight into
+        # the array
+        if self._oncewrites():
+            for line in self.lines:
+                line.unshare()
+
+    def _oncewrites(self):
+        '''Returns True if the "once" calculation may write to the lines'''
+        return True
+
+    def _onceindicators(self):
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            if not indicator._onceskip:
+                indicator._once()
+
     def preonce(self, start, end):
         pass
 
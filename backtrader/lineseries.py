@@ -241,6 +241,13 @@ class Lines(object):
         for line in self.lines:
             line.reset()
 
+    def setbufpool(self, pool):
+        '''
+        Proxy line operation
+        '''
+        for line in self.lines:
+            line.setbufpool(pool)
+
     def home(self):
         '''
         Proxy line operation
@@ -44,13 +44,30 @@ class LineObserver(six.with_metaclass(MetaLineObserver, LineObserverBase)):
     _OwnerCls = StrategyBase
     _ltype = LineIterator.ObsType
 
+    # broker: the broker (account) to observe. None: that of the strategy
+    params = (('broker', None),)
+
     extralines = 1
 
+    # In "once" mode with the postonce param of Cerebro set, an observer which
+    # sets _postonce is not called bar by bar. postonce is called instead once
+    # all bars have been processed and fills the lines from what the broker
+    # has recorded
+    _postonce = False
+
+    def getbroker(self):
+        return self.params.broker or self._owner.broker
+
+    def postonce(self):
+        pass
+
 
 # class ObserverPot(six.with_metaclass(MetaParams, object)):
 class ObserverPot(LineObserver):
     plotinfo = dict(plot=False, plotskip=True)
 
+    _postonce = True  # only a container
+
     def __init__(self, *args, **kwargs):
         self.pot = dict()
         for didx, data in enumerate(self.datas):
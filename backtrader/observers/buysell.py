@@ -35,21 +35,37 @@ class _BuySellObserver(LineObserver):
         sell=dict(marker='v', markersize=8.0, color='red', fillstyle='full')
     )
 
+    _postonce = True
+
     def __init__(self, dataidx):
         self.data = self.datas[dataidx]
+        self.seen = dict()  # ref -> exbits already seen (partial fills)
+
+    def postonce(self):
+        records = self.getbroker().records
+        buy, sell = self.lines.buy.array, self.lines.sell.array
+        for bar, bprice, sprice in records.prices(self._owner, self.data):
+            buy[bar] = bprice
+            sell[bar] = sprice
+
+        self.seen.update(records.seen(self._owner, self.data))
 
     def next(self):
         buy = list()
         sell = list()
 
-        for order in self._owner._orderspending:
-            if order.data is not self.data or not order.executed.size:
+        broker = self.getbroker()
+        for order in self._owner._orderspendingof(self.data):
+            if not order.executed.size or order.broker is not broker:
                 continue
 
-            if order.isbuy():
-                buy.append(order.executed.price)
-            else:
-                sell.append(order.executed.price)
+            exbits = order.executed.exbits
+            prices = buy if order.isbuy() else sell
+            prices.extend(exbit.price
+                          for exbit in exbits[self.seen.pop(order.ref, 0):])
+
+            if order.alive():
+                self.seen[order.ref] = len(exbits)
 
         # Write down the average buy/sell price
         self.lines.buy[0] = math.fsum(buy)/float(len(buy) or 'NaN')
@@ -27,15 +27,27 @@ from .. import LineObserver
 class CashObserver(LineObserver):
     lines = ('cash',)
 
+    _postonce = True
+
     def next(self):
-        self.lines[0][0] = self._owner.broker.getcash()
+        self.lines[0][0] = self.getbroker().getcash()
+
+    def postonce(self):
+        records = self.getbroker().records
+        self.lines[0].array[:len(records.cash)] = records.cash
 
 
 class ValueObserver(LineObserver):
     lines = ('value',)
 
+    _postonce = True
+
     def next(self):
-        self.lines[0][0] = self._owner.broker.getvalue()
+        self.lines[0][0] = self.getbroker().getvalue()
+
+    def postonce(self):
+        records = self.getbroker().records
+        self.lines[0].array[:len(records.value)] = records.value
 
 
 class CashValueObserver(LineObserver):
@@ -43,13 +55,31 @@ class CashValueObserver(LineObserver):
 
     plotinfo = dict(plotname='Cash/Market Value')
 
+    _postonce = True
+
     def __init__(self):
         self.maxdrawdown = 0.0
         self.peak = float('-inf')
 
+    def postonce(self):
+        records = self.getbroker().records
+        self.lines.cash.array[:len(records.cash)] = records.cash
+        self.lines.value.array[:len(records.value)] = records.value
+
+        peak, maxdrawdown = self.peak, self.maxdrawdown
+        for value in records.value:
+            if value > peak:
+                peak = value
+
+            drawdown = 100.0 * (peak - value) / peak
+            maxdrawdown = max(maxdrawdown, drawdown)
+
+        self.peak, self.maxdrawdown = peak, maxdrawdown
+
     def next(self):
-        self.lines.cash[0] = self._owner.broker.getcash()
-        self.lines.value[0] = value = self._owner.broker.getvalue()
+        broker = self.getbroker()
+        self.lines.cash[0] = broker.getcash()
+        self.lines.value[0] = value = broker.getvalue()
 
         # update the maximum seen peak
         if value > self.peak:
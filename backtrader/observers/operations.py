@@ -34,35 +34,52 @@ class _OperationsPnLObserver(LineObserver):
     plotlines = dict(
         pnl=dict(marker='o', color='blue', markersize=8.0, fillstyle='full'))
 
+    _postonce = True
+
     def __init__(self, dataidx):
         self.data = self.datas[dataidx]
         self.operation = Operation()
         self.operations = list()
+        self.seen = dict()  # ref -> exbits already seen (partial fills)
+
+    def postonce(self):
+        records = self.getbroker().records
+        closed, operation = records.operations(self._owner, self.data)
+        larray = self.lines.pnl.array
+        for bar, closedop in closed:
+            larray[bar] = closedop.pnl
+            self.operations.append(closedop)
+
+        if operation is not None:
+            self.operation = operation
+
+        self.seen.update(records.seen(self._owner, self.data))
 
     def next(self):
-        for order in self._owner._orderspending:
-            if order.data is not self.data or not order.executed.size:
+        broker = self.getbroker()
+        for order in self._owner._orderspendingof(self.data):
+            if not order.executed.size or order.broker is not broker:
                 continue
 
-            for exbit in order.executed.exbits:
-                self.operation.update(exbit.closed,
-                                      exbit.price,
-                                      exbit.closedvalue,
-                                      exbit.closedcomm)
-
-                if self.operation.isclosed:
-                    # operation closed, record the pnl
-                    self.lines.pnl[0] = self.operation.pnl
-                    self.operations.append(self.operation)
-
-                    # Open the next operation
-                    self.operation = Operation()
-
-                # Updated
-                self.operation.update(exbit.opened,
-                                      exbit.price,
-                                      exbit.openedvalue,
-                                      exbit.openedcomm)
+            exbits = order.executed.exbits
+            start = self.seen.pop(order.ref, 0)
+            if order.alive():
+                self.seen[order.ref] = len(exbits)
+
+            for exbit in exbits[start:]:
+                if self._update(exbit):
+                    self.lines.pnl[0] = self.operations[-1].pnl
+
+    def _update(self, exbit):
+        '''Returns True if the execution closes an operation'''
+        operation = self.operation.execute(exbit)
+        closed = operation is not self.operation
+        if closed:
+            # operation closed, record it
+            self.operations.append(self.operation)
+
+        self.operation = operation
+        return closed
 
 
 class OperationsPnLObserver(ObserverPot):
@@ -21,6 +21,8 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import itertools
+
 import six
 
 from .metabase import MetaParams
@@ -123,7 +125,7 @@ class Order(six.with_metaclass(MetaParams, object)):
     params = (
         ('owner', None), ('data', None), ('size', None), ('price', None),
         ('pricelimit', None), ('exectype', None), ('valid', None),
-        ('triggered', True),
+        ('triggered', True), ('broker', None),
     )
 
     def __getattr__(self, name):
@@ -137,7 +139,11 @@ class Order(six.with_metaclass(MetaParams, object)):
         else:
             super(Order, self).__setattribute__(name, value)
 
+    refbasis = itertools.count(1)
+
     def __init__(self):
+        self.ref = next(self.refbasis)
+
         if self.params.exectype is None:
             self.params.exectype = Order.Market
 
@@ -190,7 +196,7 @@ class Order(six.with_metaclass(MetaParams, object)):
 
         if self.valid and self.data.datetime[0] > self.valid:
             self.status = Order.Expired
-            self.executed = self.data.datetime[0]
+            self.executed.dt = self.data.datetime[0]
             return True
 
         return False
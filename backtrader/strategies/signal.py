@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import operator
+
+from ..linebuffer import LineActions
+from ..lineiterator import LineIterator
+from ..strategy import Strategy
+
+__all__ = ('SignalStrategy',)
+
+
+class SignalStrategy(Strategy):
+    '''
+    Strategy whose logic is a signal line (an indicator or an expression of
+    indicators) set in ``__init__`` with ``setsignal``. On each bar:
+
+      - signal > 0: enter the market long (closing a short position first)
+      - signal < 0: close a long position (and go short if ``short`` is True)
+
+    The orders are market orders for the first data, sized by the sizer.
+
+    In "runonce" mode the signal is calculated with the other indicators and
+    the strategy reads the values straight from its buffer: neither ``next``
+    is dispatched nor the indicators moved forward bar by bar. Subclasses
+    which override ``next``, ``nextstart`` or ``prenext`` go through the
+    regular path
+
+    Params:
+      - short: go short with negative signals
+    '''
+    params = (('short', False),)
+
+    _sigarray = None  # buffer of the signal in "runonce" mode
+    _signalling = False  # the minimum period has been reached
+
+    def setsignal(self, signal):
+        self.signal = LineActions.arrayize(signal)
+
+    def next(self):
+        self._signalnext(self.signal[0])
+
+    def _signalnext(self, signal):
+        possize = self.broker.getposition(self.datas[0]).size
+        if signal > 0.0:
+            if possize < 0:
+                self.close()
+            if possize <= 0:
+                self.buy()
+
+        elif signal < 0.0:
+            if possize > 0:
+                self.close()
+            if self.p.short and possize >= 0:
+                self.sell()
+
+    def _pure(self):
+        cls = type(self)
+        return (cls.next == SignalStrategy.next and
+                cls.nextstart == Strategy.nextstart and
+                cls.prenext == Strategy.prenext)
+
+    def _once(self):
+        super(SignalStrategy, self)._once()
+
+        self._sigarray = None
+        if self._pure() and len(self.signal.array) == self.buflen():
+            self._sigarray = self.signal.array
+            self._signalling = False
+
+    def _oncepost(self):
+        if self._sigarray is None:
+            super(SignalStrategy, self)._oncepost()
+            return
+
+        self.advance()
+        self._notify()
+
+        if not self._signalling:
+            dlens = map(operator.sub, self._minperiods, map(len, self.datas))
+            self._signalling = max(dlens) <= 0
+
+        idx = len(self) - 1
+        if self._signalling:
+            self._signalnext(self._sigarray[idx])
+
+        if idx == self.buflen() - 1:
+            # leave the indicators where the regular path leaves them
+            for indicator in self._lineiterators[LineIterator.IndType]:
+                indicator._resume()
+
+        self._oncepostbar()
@@ -27,7 +27,11 @@ import operator
 import six
 
 from .broker import BrokerBack
+from .export import export
 from .lineiterator import LineIterator, StrategyBase
+from .linecompile import compilenext
+from .linefusion import fuse
+from .linegraph import LineGraph
 from .analyzer import Analyzer
 from .sizer import SizerFix
 
@@ -38,9 +42,23 @@ class MetaStrategy(StrategyBase.__class__):
             super(MetaStrategy, cls).dopreinit(_obj, *args, **kwargs)
         _obj.env = env
         _obj.broker = env.broker
+        _obj.brokers = env.brokers
+        _obj._indcache = getattr(env, '_indcache', None)
         _obj._sizer = SizerFix()
-        _obj._orders = list()
+        maxorders = getattr(_obj.broker.params, 'maxorders', None)
+        if maxorders:
+            _obj._orders = collections.deque(maxlen=maxorders)
+        else:
+            _obj._orders = list()
         _obj._orderspending = list()
+        _obj._orderspendingbydata = None  # grouped on demand each bar
+
+        # The streaming analyzers added to cerebro
+        _obj.analyzers = list()
+        for ancls, anargs, ankwargs in getattr(env, 'analyzers', []):
+            analyzer = ancls(*anargs, **ankwargs)
+            analyzer.strategy = _obj
+            _obj.analyzers.append(analyzer)
 
         # Create an analyzer
         if _obj.params.analyzer:
@@ -100,6 +118,11 @@ class MetaStrategy(StrategyBase.__class__):
         # change operators to stage 2
         _obj._stage2()
 
+        # chains of line operations are calculated as a single one
+        _obj._fused = 0
+        if _obj.env.params.fuse:
+            _obj._fused = fuse(_obj)
+
         return _obj, args, kwargs
 
 
@@ -111,6 +134,55 @@ class Strategy(six.with_metaclass(MetaStrategy, StrategyBase)):
 
     params = (('analyzer', True),)
 
+    _nextind = None  # generated calculation of the indicators
+
+    def _once(self):
+        # skip what neither the logic nor the observers need
+        self._linegraph = LineGraph(self)
+        self._linegraph.prune()
+        super(Strategy, self)._once()
+        self._linegraph = None
+
+        self._obsnext = list(self._lineiterators[LineIterator.ObsType])
+        self._obspost = list()
+
+    def _deferobservers(self):
+        '''
+        Observers which can fill their lines after the run are no longer
+        called bar by bar: the brokers record what they need
+        '''
+        obsnext = list()
+        for observer in self._obsnext:
+            if observer._postonce:
+                self._obspost.append(observer)
+                observer.getbroker().startrecording()
+            else:
+                obsnext.append(observer)
+
+        self._obsnext = obsnext
+
+    def _postonce(self):
+        for observer in self._obspost:
+            observer.postonce()
+            for line in observer.lines:
+                line.seekend()  # where advancing bar by bar leaves them
+
+    def _onceindicators(self):
+        pool = getattr(self.env, '_oncepool', None)
+        if pool is None:
+            super(Strategy, self)._onceindicators()
+            return
+
+        # Indicators in a level only depend on those of previous levels.
+        # Those which move the pointers of the datas (generic once) cannot
+        # run alongside others
+        calc = operator.methodcaller('_once')
+        for level in self._linegraph.levels():
+            pool.map(calc, [x for x in level if self._linegraph.threadsafe(x)])
+            for indicator in level:
+                if not self._linegraph.threadsafe(indicator):
+                    indicator._once()
+
     def _oncepost(self):
         for indicator in self._lineiterators[LineIterator.IndType]:
             indicator.advance()
@@ -129,64 +201,153 @@ class Strategy(six.with_metaclass(MetaStrategy, StrategyBase)):
         else:
             self.prenext()
 
-        for observer in self._lineiterators[LineIterator.ObsType]:
+        self._oncepostbar()
+
+    def _oncepostbar(self):
+        '''
+        Closes a bar in "runonce" mode once the strategy logic has run: the
+        observers and analyzers are moved to the bar and the orders of the
+        bar are cleared
+        '''
+        for observer in self._obsnext:
             observer.advance()
             observer.next()
 
+        for analyzer in self.analyzers:
+            analyzer.next()
+
         self.clear()
 
+    def _nextcompile(self):
+        '''
+        Generates the calculation of the indicators for a bar in "next" mode
+        (see ``backtrader.linecompile``)
+        '''
+        self._nextind = compilenext(self)
+
+    def _nextindicators(self):
+        if self._nextind is None:
+            super(Strategy, self)._nextindicators()
+        else:
+            self._nextind()
+
     def _next(self):
         super(Strategy, self)._next()
+
+        for analyzer in self.analyzers:
+            analyzer.next()
+
         self.clear()
 
+    def _start(self):
+        for analyzer in self.analyzers:
+            analyzer.start()
+
+        self.start()
+
     def start(self):
         pass
 
+    def _stop(self):
+        for analyzer in self.analyzers:
+            analyzer.stop()
+
+        self.stop()
+
     def stop(self):
         pass
 
+    def _release(self):
+        released = set()
+        super(Strategy, self)._release(released)
+
+        # the datas outlive the strategy: they must no longer set the values
+        # of the released lines bound to them
+        for data in self.datas:
+            for line in data.lines:
+                line.bindings = [x for x in line.bindings
+                                 if id(x) not in released]
+
+    def summary(self):
+        '''
+        Returns a dict with the values (scalars) the strategy wants to keep
+        from the run when cerebro runs in ``compact`` mode
+        '''
+        return dict()
+
+    def export(self, fmt=None):
+        '''
+        Returns the lines of the datas, indicators and observers as columns.
+        See ``backtrader.export.export``
+        '''
+        return export(self, fmt=fmt)
+
     def clear(self):
         self._orders.extend(self._orderspending)
         self._orderspending = list()
+        self._orderspendingbydata = None
 
     def _addnotification(self, order):
         self._orderspending.append(order)
+        self._orderspendingbydata = None
+
+    def _orderspendingof(self, data):
+        '''
+        Returns the orders notified in this bar for data. The orders are
+        grouped by data once per bar, with the first request
+        '''
+        if not self._orderspending:
+            return ()
+
+        bydata = self._orderspendingbydata
+        if bydata is None:
+            bydata = self._orderspendingbydata = dict()
+            for order in self._orderspending:
+                bydata.setdefault(order.data, []).append(order)
+
+        return bydata.get(data, ())
 
     def _notify(self):
         for order in self._orderspending:
             self.notify(order)
+            for analyzer in self.analyzers:
+                analyzer.notify(order)
 
     def notify(self, order):
         pass
 
-    def buy(self, data=None, size=None, price=None, exectype=None, valid=None):
+    def buy(self, data=None, size=None, price=None, exectype=None, valid=None,
+            broker=None):
         data = data or self.datas[0]
-        size = size or self.getsizing(data)
-        return self.broker.buy(
+        broker = broker or self.broker
+        size = size or self.getsizing(data, broker)
+        return broker.buy(
             self, data, size=size, price=price, exectype=exectype, valid=valid)
 
-    def sell(self,
-             data=None, size=None, price=None, exectype=None, valid=None):
+    def sell(self, data=None, size=None, price=None, exectype=None, valid=None,
+             broker=None):
         data = data or self.datas[0]
-        size = size or self.getsizing(data)
-        return self.broker.sell(
+        broker = broker or self.broker
+        size = size or self.getsizing(data, broker)
+        return broker.sell(
             self, data, size=size, price=price, exectype=exectype, valid=valid)
 
-    def close(self,
-              data=None, size=None, price=None, exectype=None, valid=None):
-        possize = self.getposition(data, self.broker).size
+    def close(self, data=None, size=None, price=None, exectype=None,
+              valid=None, broker=None):
+        possize = self.getposition(data, broker).size
         size = abs(size or possize)
 
         if possize > 0:
-            return self.sell(data, size, price, exectype, valid)
+            return self.sell(data, size, price, exectype, valid, broker)
         elif possize < 0:
-            return self.buy(data, size, price, exectype, valid)
+            return self.buy(data, size, price, exectype, valid, broker)
 
         return None
 
     def getposition(self, data=None, broker=None):
         data = data or self.datas[0]
-        return self.broker.getposition(data)
+        broker = broker or self.broker
+        return broker.getposition(data)
 
     position = property(getposition)
 
@@ -201,9 +362,9 @@ class Strategy(six.with_metaclass(MetaStrategy, StrategyBase)):
 
     sizer = property(getsizer, setsizer)
 
-    def getsizing(self, data=None):
+    def getsizing(self, data=None, broker=None):
         data = data or self.datas[0]
-        return self._sizer.getsizing(data)
+        return self._sizer.getsizing(data, broker)
 
     def delanalyzer(self):
         '''
@@ -222,3 +383,23 @@ class Strategy(six.with_metaclass(MetaStrategy, StrategyBase)):
 
         self.analyzer = None
         self._analyzer_obs = list()
+
+
+class StrategyResult(object):
+    '''
+    Outcome of a strategy kept by cerebro in ``compact`` mode once the lines
+    of the strategy have been released
+
+    Attributes:
+      - name: class name of the strategy
+      - params: ``OrderedDict`` with the values of the params
+      - analysis: list with ``getanalysis`` of each of the analyzers
+      - summary: dict returned by ``summary`` of the strategy
+    '''
+    def __init__(self, strategy):
+        self.name = strategy.__class__.__name__
+        self.params = collections.OrderedDict(
+            zip(strategy.params._getkeys(), strategy.params._getvalues()))
+        self.analysis = [analyzer.getanalysis()
+                         for analyzer in strategy.analyzers]
+        self.summary = strategy.summary()
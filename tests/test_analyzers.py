@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        self.values = list()
+        self.inmarket = list()
+        self.traded = 0.0
+
+    def notify(self, order):
+        for exbit in order.executed.exbits:
+            self.traded += abs(exbit.size * exbit.price)
+
+    def next(self):
+        self.values.append(self.broker.getvalue())
+        self.inmarket.append(bool(self.position.size))
+
+        if len(self) % 10 == 0:
+            self.buy(size=2)
+        elif len(self) % 10 == 6:
+            self.close()
+
+    def stop(self):
+        analysis = [an.getanalysis() for an in self.analyzers]
+        self.p.results.append((analysis, self.values, self.inmarket,
+                               self.traded))
+
+
+def check(analysis, values, inmarket, traded):
+    sharpe, sortino, drawdown, exposure, turnover = analysis
+
+    rets = [v1 / v0 - 1.0 for v0, v1 in zip(values, values[1:])]
+    mean = sum(rets) / len(rets)
+    stddev = math.sqrt(sum((r - mean) ** 2 for r in rets) / (len(rets) - 1))
+    assert sharpe['bars'] == len(rets)
+    assert abs(sharpe['sharperatio'] - mean / stddev * math.sqrt(252)) < 1e-9
+
+    downdev = math.sqrt(sum(min(r, 0.0) ** 2 for r in rets) / len(rets))
+    assert abs(sortino['sortinoratio'] - mean / downdev) < 1e-9
+
+    peak, maxdd, maxlen, ddlen = values[0], 0.0, 0, 0
+    for value in values:
+        if value >= peak:
+            peak, ddlen = value, 0
+        else:
+            ddlen += 1
+        maxdd = max(maxdd, 100.0 * (peak - value) / peak)
+        maxlen = max(maxlen, ddlen)
+
+    assert abs(drawdown['maxdrawdown'] - maxdd) < 1e-9
+    assert drawdown['maxlen'] == maxlen
+
+    assert exposure['inmarket'] == sum(inmarket)
+    assert exposure['bars'] == len(values)
+
+    meanvalue = sum(values) / len(values)
+    assert abs(turnover['traded'] - traded) < 1e-6
+    assert abs(turnover['turnover'] - traded / meanvalue) < 1e-9
+
+
+def test_run(main=False):
+    for runonce in (True, False):
+        results = list()
+        cerebro = bt.Cerebro(runonce=runonce, preload=runonce)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(TestStrategy, results=results)
+        cerebro.addanalyzer(bt.analyzers.SharpeRatio, factor=252)
+        cerebro.addanalyzer(bt.analyzers.SortinoRatio)
+        cerebro.addanalyzer(bt.analyzers.DrawDown)
+        cerebro.addanalyzer(bt.analyzers.Exposure)
+        cerebro.addanalyzer(bt.analyzers.Turnover)
+        cerebro.run()
+
+        if main:
+            for analysis in results[0][0]:
+                print(analysis)
+        else:
+            check(*results[0])
+
+    # no cash: the value (and peak) is 0
+    cerebro = bt.Cerebro()
+    cerebro.broker = bt.BrokerBack(cash=0.0)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(bt.Strategy, analyzer=False)
+    cerebro.addanalyzer(bt.analyzers.DrawDown)
+    strat, = cerebro.run()
+    drawdown = strat.analyzers[0].getanalysis()
+
+    if main:
+        print(drawdown)
+    else:
+        assert drawdown['maxdrawdown'] == 0.0
+        assert drawdown['maxmoneydown'] == 0.0
+        assert not hasattr(bt.analyzers, 'StreamAnalyzer')
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        self.rejected = 0
+        self.cash = list()
+
+    def notify(self, order):
+        if order.status == bt.Order.Margin:
+            self.rejected += 1
+
+    def next(self):
+        broker = self.broker
+        # the pending orders never take more than the available cash
+        reserved = sum(broker._reserves[o.ref][0] for o in broker.pending)
+        self.cash.append((broker.getcash(), broker.reserved, reserved))
+
+        if len(self) % 4 == 0:
+            self.buy(size=1)
+            # far away: stays pending for a while and keeps cash reserved
+            self.buy(size=1, exectype=bt.Order.Limit,
+                     price=self.data.close[0] * 0.97,
+                     valid=self.data.datetime[0] + 5)
+        elif len(self) % 9 == 0:
+            self.close()
+
+    def stop(self):
+        self.p.results.append((self.rejected, self.cash, self.broker.reserved))
+
+
+def test_run(main=False):
+    results = list()
+    cerebro = bt.Cerebro()
+    cerebro.broker = bt.BrokerBack(cash=10000.0, checksubmit=True)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(TestStrategy, results=results)
+    cerebro.run()
+
+    rejected, cash, reserved = results[0]
+    if main:
+        print(rejected, cash[-1], reserved)
+    else:
+        assert rejected > 0
+        assert all(c >= 0.0 for c, _, _ in cash)
+        assert all(abs(r - s) < 1e-6 and r <= c for c, r, s in cash)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
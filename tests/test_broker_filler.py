@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+
+import testcommon
+
+import backtrader as bt
+
+FILLSIZE = 3
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        self.fills = collections.defaultdict(float)  # dt -> executed volume
+        self.seen = dict()
+        self.partials = 0
+        self.orders = list()
+
+    def notify(self, order):
+        if order.status == bt.Order.Partial:
+            self.partials += 1
+
+        exbits = order.executed.exbits
+        for exbit in exbits[self.seen.get(order.ref, 0):]:
+            self.fills[exbit.dt] += abs(exbit.size)
+
+        self.seen[order.ref] = len(exbits)
+
+    def next(self):
+        if len(self) % 20 == 0:
+            self.orders.append(self.buy(size=10))
+            # competes with the market order for the volume
+            self.orders.append(self.sell(size=4, exectype=bt.Order.Limit,
+                                         price=self.data.close[0] * 0.98))
+        elif len(self) % 20 == 10:
+            self.orders.append(self.close())
+
+    def stop(self):
+        self.p.results.append((self.fills, self.partials, self.orders))
+
+
+def test_run(main=False):
+    results = list()
+    cerebro = bt.Cerebro()
+    cerebro.broker = bt.BrokerBack(
+        filler=bt.fillers.FixedSize(size=FILLSIZE))
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(TestStrategy, results=results)
+    cerebro.run()
+
+    fills, partials, orders = results[0]
+    done = [o for o in orders if o is not None and not o.alive()]
+    if main:
+        print(len(fills), partials, len(done), len(orders))
+    else:
+        assert partials > 0
+        assert max(fills.values()) <= FILLSIZE
+        assert len(done) > len(orders) // 2
+        assert all(o.executed.size == o.created.size for o in done)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+
+class SequentialBroker(bt.BrokerBack):
+    '''Executes the Market/Close orders one after the other'''
+    def _execgroup(self, orders):
+        self._execorders(orders)
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        self.notifs = list()
+        self.bars = list()
+        self.refs = dict()  # the refs go on growing from run to run
+
+    def notify(self, order):
+        executed = order.executed
+        ref = self.refs.setdefault(order.ref, len(self.refs))
+        self.notifs.append(repr((
+            ref, order.status, executed.dt, executed.size,
+            executed.price, executed.value, executed.comm,
+            executed.psize, executed.pprice)))
+
+    def next(self):
+        self.bars.append(repr((self.broker.getcash(), self.broker.getvalue(),
+                               [(self.getposition(d).size,
+                                 self.getposition(d).price)
+                                for d in self.datas])))
+
+        # a rebalance: several orders per data, interleaved with the others
+        for i, data in enumerate(self.datas):
+            step = (len(self) + i) % 6
+            if step == 0:
+                self.buy(data, size=3)
+                self.buy(data, size=2, exectype=bt.Order.Close)
+                self.sell(data, size=1)
+            elif step == 2:
+                self.sell(data, size=7)  # reverses the position
+                self.buy(data, size=1, exectype=bt.Order.Limit,
+                         price=data.close[0] * 0.995)
+                self.buy(data, size=2)
+            elif step == 4:
+                self.close(data)
+                self.sell(data, size=1, exectype=bt.Order.Close)
+
+    def stop(self):
+        self.p.results.append((self.notifs, self.bars))
+
+
+def runstrat(brokercls):
+    results = list()
+    cerebro = bt.Cerebro()
+    cerebro.broker = brokercls()
+    cerebro.broker.setcommission(commission=2.0, margin=1000.0, mult=10.0,
+                                 name=testcommon.getdata(1)._name)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.adddata(testcommon.getdata(1))
+    cerebro.addstrategy(TestStrategy, results=results)
+    cerebro.run()
+    return results[0]
+
+
+def test_run(main=False):
+    notifs, bars = runstrat(bt.BrokerBack)
+    chknotifs, chkbars = runstrat(SequentialBroker)
+
+    if main:
+        print(len(notifs), bars[-1])
+        print(len(chknotifs), chkbars[-1])
+    else:
+        assert len(notifs) > len(bars)
+        assert notifs == chknotifs
+        assert bars == chkbars
+
+
+if __name__ == '__main__':
+    test_run(main=True)
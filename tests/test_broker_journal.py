@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+import shutil
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+
+MAXORDERS = 5
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None), ('mult', 1),)
+
+    def __init__(self):
+        self.done = list()
+
+    def notify(self, order):
+        if not order.alive():
+            self.done.append((order.ref, order.status,
+                              order.executed.size, order.executed.price))
+
+    def next(self):
+        if len(self) % 3 == 0:
+            self.buy(size=(len(self) % 7 + 1) * self.p.mult)
+        elif len(self) % 5 == 0:
+            # may not be hit and expire
+            self.sell(size=1, exectype=bt.Order.Limit,
+                      price=self.data.close[0] * 1.01,
+                      valid=self.data.datetime[0] + 2)
+
+    def stop(self):
+        self.p.results.append((self.done, list(self.broker.orders),
+                               list(self._orders)))
+
+
+def test_run(main=False):
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, 'orders.btj')
+        results = list()
+        cerebro = bt.Cerebro()
+        cerebro.broker = bt.BrokerBack(journal=path, maxorders=MAXORDERS)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(TestStrategy, results=results)
+        cerebro.run()
+
+        done, brokerorders, stratorders = results[0]
+        cols = bt.OrderJournal.read(path)
+
+        status = [i for i, kind in enumerate(cols['kind'])
+                  if kind == bt.OrderJournal.Status]
+        journaled = [(cols['ref'][i], cols['status'][i],
+                      cols['size'][i], cols['price'][i]) for i in status]
+
+        if main:
+            print(len(done), len(brokerorders), len(stratorders))
+            print(journaled[:5])
+        else:
+            assert len(done) > MAXORDERS
+            assert journaled == done
+            assert set(cols['data']) == set([testcommon.getdata(0)._name])
+            assert any(s == bt.Order.Expired for _, s, _, _ in done)
+            assert len(brokerorders) == MAXORDERS
+            assert len(stratorders) == MAXORDERS
+
+        # each optimization combination is journaled to its own file
+        results = list()
+        cerebro = bt.Cerebro()
+        cerebro.broker = bt.BrokerBack(journal=path, maxorders=MAXORDERS)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.optstrategy(TestStrategy, results=[results], mult=[1, 2])
+        cerebro.run()
+
+        for combination, (done, _, _) in enumerate(results):
+            cpath = bt.OrderJournal.combpath(path, combination)
+            cols = bt.OrderJournal.read(cpath)
+            status = [i for i, kind in enumerate(cols['kind'])
+                      if kind == bt.OrderJournal.Status]
+            journaled = [(cols['ref'][i], cols['status'][i],
+                          cols['size'][i], cols['price'][i]) for i in status]
+
+            if main:
+                print(cpath, len(journaled))
+            else:
+                assert journaled == done
+
+        if not main:
+            assert len(results) == 2
+            assert os.path.exists(os.path.join(tmpdir, 'orders.1.btj'))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
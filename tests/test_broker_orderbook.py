@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+
+class ScanBroker(bt.BrokerBack):
+    '''Checks all pending orders on each bar'''
+    def next(self):
+        for order in self.pending:
+            if order.expire():
+                self.pending.remove(order)
+                self.notify(order)
+                continue
+
+            self._try_exec(order)
+            self.pending.update(order)
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        self.orders = list()
+        self.notifs = list()
+
+    def notify(self, order):
+        self.notifs.append((len(self), self.orders.index(order), order.status,
+                            order.executed.size, order.executed.price))
+
+    def next(self):
+        for i, data in enumerate(self.datas):
+            close = data.close[0]
+            for k, mult in enumerate((0.97, 0.99, 1.01, 1.03)):
+                price = close * mult
+                valid = data.datetime[0] + 5 + k if k % 2 else None
+                if mult < 1.0:
+                    self.orders.append(self.buy(data, price=price,
+                                                exectype=bt.Order.Limit,
+                                                valid=valid))
+                    self.orders.append(self.sell(data, price=price,
+                                                 exectype=bt.Order.Stop))
+                else:
+                    self.orders.append(self.sell(data, price=price,
+                                                 exectype=bt.Order.Limit))
+                    self.orders.append(self.buy(data, price=price,
+                                                exectype=bt.Order.Stop,
+                                                valid=valid))
+
+            if len(self) % 3 == 0:
+                self.orders.append(self.buy(data))
+            if len(self) % 7 == 0 and self.getposition(data).size:
+                self.orders.append(self.close(data, exectype=bt.Order.Close))
+
+        # cancel some of the orders
+        for order in self.orders[-40::7]:
+            self.broker.cancel(order)
+
+    def stop(self):
+        self.p.results.append(
+            (self.notifs, '%f' % self.broker.getvalue()))
+
+
+class ExpiryStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def next(self):
+        # far away in price and time: only cancelling removes them
+        order = self.buy(price=self.data.close[0] * 0.5,
+                         exectype=bt.Order.Limit,
+                         valid=self.data.datetime[0] + 10000)
+        if len(self) % 10:
+            self.broker.cancel(order)
+
+    def stop(self):
+        pending = self.broker.pending
+        self.p.results.append((len(pending),
+                               len(pending.expiries[self.data])))
+
+
+def runstrat(broker, stratcls=TestStrategy):
+    results = list()
+    cerebro = bt.Cerebro()
+    cerebro.broker = broker
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.adddata(testcommon.getdata(1))
+    cerebro.addstrategy(stratcls, results=results)
+    cerebro.run()
+
+    return results[0]
+
+
+def test_run(main=False):
+    chknotifs, chkvalue = runstrat(ScanBroker())
+    notifs, value = runstrat(bt.BrokerBack())
+
+    if main:
+        print(len(chknotifs), chkvalue)
+        print(len(notifs), value)
+    else:
+        assert notifs == chknotifs
+        assert value == chkvalue
+        assert any(n[2] == bt.Order.Expired for n in notifs)
+        assert any(n[2] == bt.Order.Canceled for n in notifs)
+
+    # cancelled orders do not pile up in the expiry heap
+    pending, expiries = runstrat(bt.BrokerBack(), ExpiryStrategy)
+    if main:
+        print(pending, expiries)
+    else:
+        assert pending > 0
+        assert pending <= expiries <= 2 * pending + 1
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        self.values = list()
+
+    def next(self):
+        broker = self.broker
+        posvalue = 0.0
+        for data, position in broker.positions.items():
+            comminfo = broker.getcommissioninfo(data)
+            posvalue += comminfo.getvalue(position, data.close[0])
+
+        self.values.append((broker.getvalue(), broker.getcash() + posvalue))
+
+        for i, data in enumerate(self.datas):
+            if (len(self) + i) % 5 == 0:
+                self.buy(data, size=i + 1)
+            elif (len(self) + i) % 11 == 0:
+                self.close(data)
+
+    def stop(self):
+        self.p.results.append(self.values)
+
+
+def test_run(main=False):
+    results = list()
+    cerebro = bt.Cerebro()
+    cerebro.broker.setcommission(commission=2.0, margin=1000.0, mult=10.0,
+                                 name=testcommon.getdata(1)._name)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.adddata(testcommon.getdata(1))
+    cerebro.addstrategy(TestStrategy, results=results)
+    cerebro.run()
+
+    values = results[0]
+    if main:
+        print(values[-1])
+    else:
+        assert all(value == scanvalue for value, scanvalue in values)
+        assert values[0] != values[-1]
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+ACCOUNTS = [(10000.0, 0.0), (50000.0, 0.002), (100000.0, 0.01)]
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        self.sma = btind.SMA(self.data, period=15)
+        self.cross = btind.CrossOver(self.data.close, self.sma)
+        self.values = [list() for broker in self.brokers]
+        self.observers = [bt.observers.CashValueObserver(broker=broker)
+                          for broker in self.brokers]
+
+    def next(self):
+        for broker, values in zip(self.brokers, self.values):
+            values.append((broker.getcash(), broker.getvalue()))
+
+            if self.cross[0] > 0.0:
+                self.buy(size=1, broker=broker)
+            elif self.cross[0] < 0.0:
+                self.close(broker=broker)
+
+    def stop(self):
+        obsvalues = [list(obs.lines.value.array) for obs in self.observers]
+        self.p.results.append((self.values, obsvalues))
+
+
+def runstrat(accounts):
+    results = list()
+    cerebro = bt.Cerebro()
+    for i, (cash, commission) in enumerate(accounts):
+        broker = bt.BrokerBack(cash=cash)
+        broker.setcommission(commission=commission)
+        if not i:
+            cerebro.broker = broker
+        else:
+            cerebro.addbroker(broker)
+
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(TestStrategy, results=results)
+    cerebro.run()
+    return results[0]
+
+
+def test_run(main=False):
+    values, obsvalues = runstrat(ACCOUNTS)
+
+    for i, account in enumerate(ACCOUNTS):
+        chkvalues, chkobsvalues = runstrat([account])
+        if main:
+            print(values[i][-1], chkvalues[0][-1])
+        else:
+            assert values[i] == chkvalues[0]
+            assert obsvalues[i] == chkobsvalues[0]
+
+    if not main:
+        assert len(set(v[-1] for v in values)) == len(ACCOUNTS)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+PERIODS = [10, 15, 20]
+
+
+class TestStrategy(bt.Strategy):
+    params = (('period', 15), ('strats', None))
+
+    def __init__(self):
+        self.sma = btind.SMA(self.data, period=self.p.period)
+        self.cross = btind.CrossOver(self.data.close, self.sma)
+        # binds its line to the line of the data
+        self.envelope = btind.Envelope(self.data, perc=self.p.period / 10.0)
+        self.p.strats.append(self)
+
+    def next(self):
+        if self.cross[0] > 0.0:
+            self.buy()
+        elif self.cross[0] < 0.0:
+            self.close()
+
+    def summary(self):
+        return dict(value=self.broker.getvalue(), bars=len(self))
+
+
+def runstrat(compact):
+    strats = list()
+    cerebro = bt.Cerebro(compact=compact)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.optstrategy(TestStrategy, period=PERIODS, strats=[strats])
+    cerebro.addanalyzer(bt.analyzers.DrawDown)
+    results = cerebro.run()
+    return results, strats, cerebro
+
+
+def test_run(main=False):
+    results, strats, cerebro = runstrat(compact=True)
+    if main:
+        for result in results:
+            print(result[0].params['period'], result[0].summary,
+                  result[0].analysis)
+        return
+
+    assert not cerebro.runstrats
+    assert len(results) == len(PERIODS)
+    for (result,), period in zip(results, PERIODS):
+        assert result.name == 'TestStrategy'
+        assert result.params['period'] == period
+
+    # the lines of each combination have been released
+    for strat in strats:
+        assert not len(strat.sma.lines.sma.array)
+        assert not len(strat.cross.lines[0].array)
+        assert not len(strat.envelope.lines.src.array)
+
+    # the datas no longer set the values of released lines
+    for line in cerebro.datas[0].lines:
+        assert not line.bindings
+
+    # same outcome as a regular run
+    for (result,), period in zip(results, PERIODS):
+        chkstrats = list()
+        cerebro = bt.Cerebro()
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(TestStrategy, period=period, strats=chkstrats)
+        cerebro.addanalyzer(bt.analyzers.DrawDown)
+        chkstrat, = cerebro.run()
+        assert result.summary == chkstrat.summary()
+        assert result.analysis == [an.getanalysis()
+                                   for an in chkstrat.analyzers]
+        assert len(chkstrat.sma.lines.sma.array)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import os.path
+import shutil
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class TestStrategy(bt.Strategy):
+    def __init__(self):
+        self.sma = btind.SMA(self.data, period=15)
+        self.macd = btind.MACDHisto(self.data)
+        self.cross = btind.CrossOver(self.data.close, self.sma)
+        self.nexts = 0
+
+    def next(self):
+        self.nexts += 1
+        if self.cross[0] > 0.0:
+            self.buy()
+        elif self.cross[0] < 0.0 and self.position:
+            self.close()
+
+    def results(self):
+        vals = [len(self), self.nexts, '%f' % self.broker.getvalue()]
+        for ind in (self.sma, self.macd, self.cross):
+            for line in ind.lines:
+                vals.append('%f' % line[0])
+                vals.append('%f' % line[-len(line) // 2])
+
+        return vals
+
+
+def runstrat(datapath, runonce, newrows=None):
+    cerebro = bt.Cerebro(runonce=runonce, preload=runonce)
+    cerebro.adddata(testcommon.DATAFEED(dataname=datapath))
+    cerebro.addstrategy(TestStrategy)
+    strat = cerebro.run()[0]
+
+    if newrows is not None:
+        with io.open(datapath, 'ab') as f:
+            f.writelines(newrows)
+
+        strat = cerebro.resume()[0]
+
+    return strat.results()
+
+
+def test_run(main=False):
+    srcpath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                           testcommon.datafiles[0])
+    with io.open(srcpath, 'rb') as f:
+        rows = f.readlines()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        datapath = os.path.join(tmpdir, 'data.txt')
+        for runonce in (True, False):
+            with io.open(datapath, 'wb') as f:
+                f.writelines(rows)
+
+            chkresults = runstrat(datapath, runonce)
+
+            with io.open(datapath, 'wb') as f:
+                f.writelines(rows[:-40])
+
+            results = runstrat(datapath, runonce, newrows=rows[-40:])
+
+            if main:
+                print(chkresults)
+                print(results)
+            else:
+                assert results == chkresults
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -97,9 +97,30 @@ def check_futures():
     assert ca == size * (newprice - price) * mult
 
 
+def check_broker():
+    broker = bt.BrokerBack()
+    data0, data1 = testcommon.getdata(0), testcommon.getdata(1)
+
+    default = broker.getcommissioninfo(data0)
+    assert broker.getcommissioninfo(data1) is default
+
+    # the resolution per data is redone when the schemes change
+    broker.setcommission(commission=2.0, margin=1000.0, name=data1._name)
+    comm = broker.getcommissioninfo(data1)
+    assert comm is not default
+    assert comm.margin == 1000.0 and comm.commission == 2.0
+    assert broker.getcommissioninfo(data0) is default
+
+    other = bt.CommissionInfo(commission=0.1)
+    broker.addcommissioninfo(other)
+    assert broker.getcommissioninfo(data0) is other
+    assert broker.getcommissioninfo(data1) is comm
+
+
 def test_run(main=False):
     check_stocks()
     check_futures()
+    check_broker()
 
 
 if __name__ == '__main__':
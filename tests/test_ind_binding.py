@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+from backtrader.lineiterator import LineIterator
+
+
+class Capped(bt.Indicator):
+    '''Writes straight into the array of a line bound to a sub-indicator'''
+    lines = ('capped',)
+
+    def __init__(self):
+        self.sma = btind.SMA(self.data, period=5)
+        self.lines.capped = self.sma
+
+    def next(self):
+        self.lines.capped[0] = min(self.lines.capped[0], self.data[0])
+
+    def once(self, start, end):
+        dst = self.lines.capped.array
+        src = self.data.array
+        for i in range(start, end):
+            dst[i] = min(dst[i], src[i])
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        self.macd = btind.MACDHisto(self.data)
+        self.capped = Capped(self.data)
+
+    def stop(self):
+        values = [list(line.array) for line in self.macd.lines]
+        values += [list(self.capped.sma.array), list(self.capped.array)]
+        self.p.results.append((self.macd, values))
+
+
+def runstrat(runonce):
+    results = list()
+    cerebro = bt.Cerebro(runonce=runonce)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(TestStrategy, results=results)
+    cerebro.run()
+    return results[0]
+
+
+def test_run(main=False):
+    macd, values = runstrat(runonce=True)
+    _, chkvalues = runstrat(runonce=False)
+
+    histo = macd.lines.histo
+    subs = macd._lineiterators[LineIterator.IndType]
+    source, = [sub for sub in subs if sub.array is histo.array]
+    if main:
+        print(macd.lines.histo._shared, source)
+        return
+
+    assert repr(values) == repr(chkvalues)
+
+    # the bound lines share the buffer of the source in "once" mode
+    assert all(line._shared for line in macd.lines)
+
+    # and take a private copy of it when written
+    srcvalue = source.array[-1]
+    histo.seekend()
+    histo[0] = 1000.0
+    assert histo.array is not source.array
+    assert source.array[-1] == srcvalue and histo.array[-1] == 1000.0
+
+
+if __name__ == '__main__':
+    test_run(main=True)
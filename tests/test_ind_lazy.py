@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class PartlyUsed(bt.Indicator):
+    lines = ('sma',)
+
+    def __init__(self):
+        self.unused = btind.KAMA(self.data)
+        self.lines.sma = btind.SMA(self.data, period=5)
+
+
+class TestStrategy(bt.Strategy):
+    params = (('lazy', True), ('results', None),)
+
+    def __init__(self):
+        self.partly = PartlyUsed(self.data)
+        self.kama = btind.KAMA(self.data, lazy=self.p.lazy)
+        self.macd = btind.MACDHisto(self.data, plotonly=self.p.lazy)
+        self.never = btind.Stochastic(self.data, lazy=self.p.lazy)
+        self.nexts = 0
+
+    def next(self):
+        self.nexts += 1
+        if self.nexts == 100:
+            self.kamaval = self.kama[0]  # calculated when read
+
+    def stop(self):
+        skipped = [self.partly.unused._onceskip, self.never._onceskip]
+        vals = ['%f' % self.kamaval]
+        for ind in (self.partly, self.kama, self.macd):
+            for line in ind.lines:
+                vals.append('%f' % line[0])
+                vals.append('%f' % line[-len(line) // 2])
+
+        self.p.results.append((skipped, vals))
+
+
+def runstrat(lazy, runonce):
+    results = list()
+    cerebro = bt.Cerebro(runonce=runonce, preload=runonce)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(TestStrategy, lazy=lazy, results=results)
+    cerebro.run()
+
+    return results[0]
+
+
+def test_run(main=False):
+    chkskipped, chkvals = runstrat(lazy=False, runonce=False)
+    skipped, vals = runstrat(lazy=True, runonce=True)
+
+    if main:
+        print(chkskipped, chkvals)
+        print(skipped, vals)
+    else:
+        assert chkskipped == [False, False]
+        assert skipped == [True, True]
+        assert vals == chkvals
+
+
+if __name__ == '__main__':
+    test_run(main=True)
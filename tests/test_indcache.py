@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class TestStrategy(bt.Strategy):
+    params = (('period', 15), ('dummy', 0), ('results', None), ('hits', None),)
+
+    def __init__(self):
+        self.sma = btind.SMA(self.data, period=self.p.period)
+        self.kama = btind.KAMA(self.data)
+        self.macd = btind.MACDHisto(self.data)
+        self.cross = btind.CrossOver(self.data.close, self.sma)
+
+    def stop(self):
+        vals = list()
+        for ind in (self.sma, self.kama, self.macd, self.cross):
+            for line in ind.lines:
+                vals.append('%f' % line[0])
+                vals.append('%f' % line[-len(line) // 2])
+
+        self.p.results.append(vals)
+
+        if self._indcache is not None:
+            self.p.hits.append(self._indcache.hits)
+
+
+def runcache(indcache, main=False):
+    results = list()
+    hits = list()
+    cerebro = bt.Cerebro(indcache=indcache)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.optstrategy(TestStrategy,
+                        period=[10, 15], dummy=[1, 2, 3],
+                        results=[results], hits=[hits])
+    cerebro.run()
+
+    return results, hits
+
+
+def test_run(main=False):
+    chkresults, chkhits = runcache(indcache=0)
+    results, hits = runcache(indcache=8 * 1024 * 1024)
+
+    if main:
+        print(chkresults)
+        print(results)
+        print(hits)
+    else:
+        assert results == chkresults
+        assert not chkhits
+        assert hits[-1] > 0
+
+
+if __name__ == '__main__':
+    test_run(main=True)
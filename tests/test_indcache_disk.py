@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import os.path
+import shutil
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None), ('hits', None),)
+
+    def __init__(self):
+        self.sma = btind.SMA(self.data, period=15)
+        self.kama = btind.KAMA(self.data)
+        self.adx = btind.ADX(self.data)
+        self.stoc = btind.Stochastic(self.data)
+
+    def stop(self):
+        vals = list()
+        for ind in (self.sma, self.kama, self.adx, self.stoc):
+            for line in ind.lines:
+                vals.append('%f' % line[0])
+                vals.append('%f' % line[-len(line) // 2])
+
+        self.p.results.append(vals)
+
+        if self._indcache is not None:
+            self.p.hits.append(self._indcache.hits)
+
+
+def runcache(datapath, indcachedir):
+    results = list()
+    hits = list()
+    cerebro = bt.Cerebro(indcachedir=indcachedir)
+    cerebro.adddata(testcommon.DATAFEED(dataname=datapath))
+    cerebro.addstrategy(TestStrategy, results=results, hits=hits)
+    cerebro.run()
+
+    return results, hits
+
+
+def test_run(main=False):
+    srcpath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                           testcommon.datafiles[0])
+    with io.open(srcpath, 'rb') as f:
+        rows = f.readlines()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        datapath = os.path.join(tmpdir, 'data.txt')
+        cachedir = os.path.join(tmpdir, 'cache')
+
+        # 1st run with part of the data, 2nd after appending the rest to the
+        # file (partial calculation) and 3rd with the same data (full hit)
+        runs = list()
+        for lastrow in (len(rows) - 50, len(rows), len(rows)):
+            with io.open(datapath, 'wb') as f:
+                f.writelines(rows[:lastrow])
+
+            runs.append(runcache(datapath, indcachedir=cachedir))
+
+        chkresults, chkhits = runcache(datapath, indcachedir=None)
+    finally:
+        shutil.rmtree(tmpdir)
+
+    if main:
+        print(chkresults)
+        for results, hits in runs:
+            print(results)
+            print(hits)
+    else:
+        assert not chkhits
+        assert runs[0][1] == [0]
+        assert runs[1][1][0] > 0
+        assert runs[1][0] == chkresults
+        assert runs[2][1][0] > 0
+        assert runs[2][0] == chkresults
+
+
+if __name__ == '__main__':
+    test_run(main=True)
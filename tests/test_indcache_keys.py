@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class ArgInd(bt.Indicator):
+    '''Takes the period as an argument for __init__ (not a param)'''
+    lines = ('avg',)
+    _cacheable = True
+
+    def __init__(self, period):
+        self.period = period
+        self.addminperiod(period)
+
+    def next(self):
+        self.lines.avg[0] = math.fsum(self.data.get(size=self.period))
+
+
+class OwnerInd(bt.Indicator):
+    '''Composite which reads the period from the owner'''
+    lines = ('avg',)
+
+    def __init__(self):
+        self.lines.avg = btind.SMA(self.data, period=self._owner.p.period)
+
+
+class OwnerNextInd(bt.Indicator):
+    '''Reads the period from the owner in its own logic: not cached'''
+    lines = ('avg',)
+
+    def next(self):
+        period = self._owner.p.period
+        if len(self) >= period:
+            self.lines.avg[0] = math.fsum(self.data.get(size=period))
+
+
+class TestStrategy(bt.Strategy):
+    params = (('period', 5), ('results', None))
+
+    def __init__(self):
+        self.inds = [ArgInd(self.data, self.p.period), OwnerInd(self.data),
+                     OwnerNextInd(self.data)]
+
+    def stop(self):
+        self.p.results.append([ind.lines[0][0] for ind in self.inds])
+
+
+def runcache(indcache):
+    results = list()
+    cerebro = bt.Cerebro(indcache=indcache)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.optstrategy(TestStrategy, period=[5, 20, 5], results=[results])
+    cerebro.run()
+    return results
+
+
+def test_run(main=False):
+    chkresults = runcache(indcache=0)
+    results = runcache(indcache=8 * 1024 * 1024)
+    if main:
+        print(chkresults)
+        print(results)
+    else:
+        assert chkresults[0] != chkresults[1]
+        assert repr(results) == repr(chkresults)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
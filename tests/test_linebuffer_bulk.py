@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+from backtrader.linebuffer import LineBuffer
+
+
+def test_run(main=False):
+    lb = LineBuffer()
+    lb.forward(size=5)
+    lb.forward(value=1.0)
+    lb.forward(value=2.0, size=3)
+    lb.extend(value=3.0, size=2)
+    lb.forward(size=0)
+
+    values = list(lb.array)
+    if main:
+        print(len(lb), lb.buflen(), values)
+        return
+
+    assert len(lb) == 9 and lb.buflen() == 9
+    assert all(math.isnan(v) for v in values[:5])
+    assert values[5:] == [1.0, 2.0, 2.0, 2.0, 3.0, 3.0]
+
+    lb.backwards(size=3)
+    assert len(lb) == 6 and list(lb.array[5:]) == [1.0, 2.0, 2.0]
+    lb.backwards(size=0)
+    assert len(lb.array) == 8
+
+    # the cached fills are not modified through the buffers
+    lb.reset()
+    lb.forward(size=4)
+    lb[0] = 5.0
+    chk = LineBuffer()
+    chk.forward(size=4)
+    assert all(math.isnan(v) for v in chk.array)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
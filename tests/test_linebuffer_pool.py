@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+PERIODS = [15, 10, 20, 15]
+
+
+class TestStrategy(bt.Strategy):
+    params = (('period', 15), ('arrays', None))
+
+    def __init__(self):
+        self.sma = btind.SMA(self.data, period=self.p.period)
+        self.diff = self.data.close - self.sma
+
+    def stop(self):
+        lines = list(self.data.lines) + [self.sma.lines.sma, self.diff]
+        self.p.arrays.append([line.array for line in lines])
+
+    def summary(self):
+        values = list(self.sma.lines.sma.array) + list(self.diff.array)
+        nans = [v for v in values if math.isnan(v)]
+        return dict(nans=len(nans), total=math.fsum(v for v in values
+                                                     if not math.isnan(v)))
+
+
+class FailStrategy(TestStrategy):
+    def stop(self):
+        raise ValueError('strategy failure')
+
+
+def runstrat(compact, periods):
+    arrays = list()
+    cerebro = bt.Cerebro(compact=compact)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.optstrategy(TestStrategy, period=periods, arrays=[arrays])
+    results = cerebro.run()
+    return results, arrays
+
+
+def test_run(main=False):
+    results, arrays = runstrat(True, PERIODS)
+    summaries = [result.summary for result, in results]
+    if main:
+        print(summaries)
+        return
+
+    # the buffers of a combination are reused by the next one
+    for prev, cur in zip(arrays, arrays[1:]):
+        assert any(a is b for a in prev for b in cur)
+
+    # the pool is not kept in the class (process wide)
+    assert bt.LineBuffer.bufpool is None
+
+    # the datas do not keep the pool when a run raises
+    cerebro = bt.Cerebro(compact=True)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.optstrategy(FailStrategy, period=PERIODS, arrays=[list()])
+    try:
+        cerebro.run()
+    except ValueError:
+        pass
+
+    assert all(line.bufpool is None for line in cerebro.datas[0].lines)
+
+    for summary, period in zip(summaries, PERIODS):
+        (chkstrat,), _ = runstrat(False, [period])
+        assert summary == chkstrat.summary()
+        assert summary['nans'] == period - 1 + period - 1
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+from backtrader.lineiterator import LineIterator
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        d = self.data
+        # chain: only the outer operation is materialized
+        self.ratio = ((d.close - d.open) / (d.high - d.low + 1.0)) * 100.0
+        # kept in an attribute: read by the logic and not inlined
+        self.spread = d.high - d.low
+        self.scaled = abs(self.spread - 10.0) / 2.0
+        self.sma = btind.SMA(self.data, period=10)
+        # read by an indicator: not inlined
+        self.body = btind.SMA(d.close - d.open, period=5)
+        # kept in a list: the outer operation is not inlined
+        self.ops = [d.open * 2.0 + 1.0]
+        self.values = list()
+
+    def next(self):
+        self.values.append((self.ratio[0], self.spread[0], self.scaled[0],
+                            self.body[0], self.ops[0][0]))
+
+    def stop(self):
+        ops = [node for node in self._lineiterators[LineIterator.IndType]
+               if isinstance(node, bt.LineActions)]
+        self.p.results.append((self._fused, len(ops), self.values))
+
+
+def runstrat(runonce, fuse=True):
+    results = list()
+    cerebro = bt.Cerebro(runonce=runonce, fuse=fuse)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(TestStrategy, results=results)
+    cerebro.run()
+    return results[0]
+
+
+def test_run(main=False):
+    data = testcommon.getdata(0)
+    data.start()
+    data.preload()
+    o, h, l, c = (list(line.array) for line in (
+        data.open, data.high, data.low, data.close))
+
+    for runonce in (True, False):
+        fused, nops, values = runstrat(runonce)
+        chkfused, chknops, chkvalues = runstrat(runonce, fuse=False)
+        if main:
+            print(runonce, fused, nops, values[-1])
+            continue
+
+        # 4 operations inlined in ratio, 2 in scaled and 1 in ops[0]. spread,
+        # the input of body and ops[0] remain
+        assert fused == 7 and nops == 5
+        assert chkfused == 0 and chknops == nops + fused
+        assert values == chkvalues
+
+        offset = len(c) - len(values)
+        for i, (ratio, spread, scaled, _, op) in enumerate(values, offset):
+            assert ratio == (c[i] - o[i]) / (h[i] - l[i] + 1.0) * 100.0
+            assert spread == h[i] - l[i]
+            assert scaled == abs(spread - 10.0) / 2.0
+            assert op == o[i] * 2.0 + 1.0
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        self.executed = [dict() for data in self.datas]  # bar -> buy, sell
+
+    def notify(self, order):
+        if order.executed.size:
+            # datas overload the comparison operators: no list.index
+            didx = [d is order.data for d in self.datas].index(True)
+            buy, sell = self.executed[didx].setdefault(len(self), ([], []))
+            (buy if order.isbuy() else sell).append(order.executed.price)
+
+    def next(self):
+        for i, data in enumerate(self.datas):
+            if (len(self) + i) % 6 == 0:
+                self.buy(data, size=1)
+            elif (len(self) + i) % 6 == 3:
+                self.close(data)
+
+    def stop(self):
+        buysell = self.analyzer.buysell
+        observed = list()
+        for data, executed in zip(self.datas, self.executed):
+            obs = buysell[data]
+            lines = (obs.lines.buy.array, obs.lines.sell.array)
+            for bar in range(len(self)):
+                expected = executed.get(bar + 1, ([], []))
+                for prices, larray in zip(expected, lines):
+                    value = larray[bar]
+                    observed.append(
+                        (math.isnan(value) and not prices) or
+                        value == math.fsum(prices) / len(prices))
+
+        self.p.results.append((observed, self.executed))
+
+
+def test_run(main=False):
+    for runonce in (True, False):
+        results = list()
+        cerebro = bt.Cerebro(runonce=runonce, preload=runonce)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(TestStrategy, results=results)
+        cerebro.run()
+
+        observed, executed = results[0]
+        if main:
+            print(all(observed), [len(x) for x in executed])
+        else:
+            assert all(observed)
+            assert all(executed)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
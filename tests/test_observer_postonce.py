@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        self.cash = bt.observers.CashObserver()
+        self.value = bt.observers.ValueObserver()
+        self.seen = list()  # what the logic reads from the observers
+
+    def next(self):
+        cashvalue = self.analyzer.cashvalue
+        if not self.env.params.postonce and len(cashvalue):
+            self.seen.append((repr(cashvalue.value[0]), cashvalue.maxdrawdown))
+
+        for i, data in enumerate(self.datas):
+            if (len(self) + i) % 7 == 0:
+                self.buy(data, size=5)
+                self.buy(data, size=2, exectype=bt.Order.Limit,
+                         price=data.close[0] * 0.99)
+            elif (len(self) + i) % 7 == 4:
+                self.close(data)
+
+    def stop(self):
+        analyzer = self.analyzer
+        observers = [self.cash, self.value, analyzer.cashvalue]
+        for data in self.datas:
+            observers += [analyzer.buysell[data], analyzer.operations[data]]
+
+        lines = list()
+        for observer in observers:
+            for line in observer.lines:
+                # NaN != NaN: compare a representation
+                lines.append(([repr(x) for x in line.array], len(line)))
+
+        cashvalue = analyzer.cashvalue
+        stats = (cashvalue.peak, cashvalue.maxdrawdown,
+                 [[o.pnl for o in analyzer.operations[data].operations]
+                  for data in self.datas])
+
+        self.p.results.append((lines, stats, self.seen))
+
+
+def runstrat(runonce, postonce=False):
+    results = list()
+    cerebro = bt.Cerebro(runonce=runonce, preload=runonce, postonce=postonce)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(TestStrategy, results=results)
+    cerebro.run()
+    return results[0]
+
+
+def test_run(main=False):
+    chklines, chkstats, chkseen = runstrat(False)
+    lines, stats, seen = runstrat(True)
+    postlines, poststats, _ = runstrat(True, postonce=True)
+
+    if main:
+        print(poststats[:2], chkstats[:2])
+        print(seen[-1], chkseen[-1])
+    else:
+        # observers called bar by bar: live values during the run
+        assert seen == chkseen
+        assert any(dd for _, dd in seen)
+        assert lines == chklines
+        assert stats == chkstats
+
+        # observers filled after the run
+        assert postlines == chklines
+        assert poststats == chkstats
+        assert any(poststats[2])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import threading
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class NextOnly(bt.Indicator):
+    '''Uses the generic once, which moves the pointers of the datas'''
+    lines = ('diff',)
+
+    def next(self):
+        self.lines.diff[0] = self.data0.close[0] - self.data1[0]
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        inds = list()
+        for data in self.datas:
+            sma = btind.SMA(data, period=15)
+            inds += [sma, btind.ATR(data), btind.RSI(data), btind.KAMA(data),
+                     btind.CrossOver(data.close, sma),
+                     NextOnly(data, sma), btind.EMA(sma)]
+
+        self.inds = inds
+
+    def stop(self):
+        vals = list()
+        for ind in self.inds:
+            for line in ind.lines:
+                vals.append('%f' % line[0])
+                vals.append('%f' % line[-len(line) // 2])
+
+        self.p.results.append(vals)
+
+
+class FailStrategy(TestStrategy):
+    def next(self):
+        raise ValueError('strategy failure')
+
+
+def runstrat(oncethreads):
+    results = list()
+    cerebro = bt.Cerebro(oncethreads=oncethreads)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.adddata(testcommon.getdata(1))
+    cerebro.addstrategy(TestStrategy, results=results)
+    cerebro.run()
+
+    return results
+
+
+def test_run(main=False):
+    chkresults = runstrat(oncethreads=0)
+    results = runstrat(oncethreads=4)
+
+    if main:
+        print(chkresults)
+        print(results)
+    else:
+        assert results == chkresults
+
+    # the workers are stopped when the run raises
+    nthreads = threading.active_count()
+    cerebro = bt.Cerebro(oncethreads=4)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(FailStrategy, results=list())
+    raised = False
+    try:
+        cerebro.run()
+    except ValueError:
+        raised = True
+
+    if main:
+        print(nthreads, threading.active_count())
+    else:
+        assert raised
+        assert cerebro._oncepool is None
+        assert threading.active_count() == nthreads
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        self.sma = btind.SMA(self.data0, period=10)
+        self.smaweek = btind.SMA(self.data1, period=3)
+        self.diff = self.data0.close - self.sma
+
+    def stop(self):
+        self.p.results.append(self.export())
+
+
+def test_run(main=False):
+    results = list()
+    cerebro = bt.Cerebro()
+    data0, data1 = testcommon.getdata(0), testcommon.getdata(1)
+    cerebro.adddata(data0)
+    cerebro.adddata(data1)
+    cerebro.addstrategy(TestStrategy, results=results)
+    strat = cerebro.run()[0]
+
+    cols = results[0]
+    if main:
+        for name, values in cols.items():
+            print(name, len(values), values[-1])
+        return
+
+    size = len(strat)
+    assert list(cols)[0] == 'datetime'
+    assert all(len(values) == size for values in cols.values())
+
+    # aligned with the main data: no copies
+    for name, line in (('datetime', data0.datetime),
+                       (data0._name + '.close', data0.close),
+                       ('sma.sma', strat.sma.lines.sma),
+                       ('diff', strat.diff)):
+        values = cols[name]
+        assert getattr(values, 'obj', values) is line.array
+        assert list(map(repr, values)) == list(map(repr, line.array[:size]))
+
+    # weekly data aligned to the daily datetimes
+    closes = cols[data1._name + '.close']
+    wdts = list(data1.datetime.array[:len(data1)])
+    wcloses = list(data1.close.array[:len(data1)])
+    for dt, close in zip(cols['datetime'], closes):
+        known = [c for wdt, c in zip(wdts, wcloses) if wdt <= dt]
+        assert close == known[-1] if known else math.isnan(close)
+
+    assert len(cols['smaweek.sma']) == size
+    assert 'CashValueObserver.value' in cols
+
+    try:
+        import numpy as np
+    except ImportError:
+        return  # optional
+
+    npcols = strat.export(fmt='numpy')
+    assert np.shares_memory(npcols['sma.sma'],
+                            np.frombuffer(strat.sma.lines.sma.array))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class PhaseInd(bt.Indicator):
+    lines = ('phase',)
+    params = (('period', 5),)
+
+    def __init__(self):
+        self.sma = btind.SMA(self.data, period=self.p.period)
+        self.addminperiod(self.p.period)
+
+    def prenext(self):
+        self.lines.phase[0] = -1.0
+
+    def nextstart(self):
+        self.lines.phase[0] = 0.0
+
+    def next(self):
+        self.lines.phase[0] = self.sma[0] - self.sma[-1]
+
+
+class TestStrategy(bt.Strategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        self.phase = PhaseInd(self.data0)
+        self.macd = btind.MACDHisto(self.data0)
+        self.stoch = btind.Stochastic(self.data1)
+        self.diff = self.data0.close - self.stoch.lines.percD
+        self.values = list()
+
+    def next(self):
+        self.values.append((len(self.data0), len(self.data1),
+                            self.phase[0], self.macd.histo[0],
+                            self.stoch.percK[0], self.diff[0]))
+
+    def stop(self):
+        # including the values calculated in prenext/nextstart
+        self.values.append(list(self.phase.lines.phase.array))
+        self.p.results.append((self._nextind is not None, self.values))
+
+
+def runstrat(nextcompile):
+    results = list()
+    cerebro = bt.Cerebro(runonce=False, nextcompile=nextcompile)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.adddata(testcommon.getdata(1))
+    cerebro.addstrategy(TestStrategy, results=results)
+    cerebro.run()
+    return results[0]
+
+
+def test_run(main=False):
+    compiled, values = runstrat(nextcompile=True)
+    chkcompiled, chkvalues = runstrat(nextcompile=False)
+    if main:
+        print(compiled, len(values), values[-2])
+        return
+
+    assert compiled and not chkcompiled
+    assert values and repr(values) == repr(chkvalues)
+    assert values[-1][:5] == [-1.0] * 4 + [0.0]
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class SignalStrategy(bt.strategies.SignalStrategy):
+    params = (('results', None),)
+
+    def __init__(self):
+        sma = btind.SMA(self.data, period=15)
+        self.setsignal(btind.CrossOver(self.data.close, sma))
+
+    def stop(self):
+        self.p.results.append(self.analyzer.cashvalue.lines.value.array[:])
+
+
+class NextStrategy(bt.Strategy):
+    params = (('results', None), ('short', False),)
+
+    def __init__(self):
+        sma = btind.SMA(self.data, period=15)
+        self.cross = btind.CrossOver(self.data.close, sma)
+
+    def next(self):
+        if self.cross[0] > 0.0:
+            if self.position.size < 0:
+                self.close()
+            if self.position.size <= 0:
+                self.buy()
+
+        elif self.cross[0] < 0.0:
+            if self.position.size > 0:
+                self.close()
+            if self.p.short and self.position.size >= 0:
+                self.sell()
+
+    def stop(self):
+        self.p.results.append(self.analyzer.cashvalue.lines.value.array[:])
+
+
+def runstrat(strategy, runonce, short):
+    results = list()
+    cerebro = bt.Cerebro(runonce=runonce, preload=runonce)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(strategy, results=results, short=short)
+    strat = cerebro.run()[0]
+    return results[0], len(strat), len(strat.analyzer.cashvalue)
+
+
+def test_run(main=False):
+    for short in (False, True):
+        chk = runstrat(NextStrategy, True, short)
+        for runonce in (True, False):
+            values = runstrat(SignalStrategy, runonce, short)
+            if main:
+                print(short, runonce, values[0][-1], chk[0][-1])
+            else:
+                assert values == chk
+
+    if not main:
+        assert runstrat(SignalStrategy, True, False)[0][-1] != \
+            runstrat(SignalStrategy, True, True)[0][-1]
+
+
+if __name__ == '__main__':
+    test_run(main=True)